@@ -0,0 +1,200 @@
+from array import array
+from bisect import bisect_right
+
+from timeline import SECONDS_PER_DAY
+
+
+def parse_time(time_str):
+    """Zamienia napis "HH:MM" na minutę doby (ValueError dla nieprawidłowej godziny)."""
+    if not isinstance(time_str, str):
+        raise ValueError(f"Nieprawidłowa godzina: {time_str!r}")
+    hour, minute = time_str.split(":")
+    hour, minute = int(hour), int(minute)
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Nieprawidłowa godzina: {time_str}")
+    return hour * 60 + minute
+
+
+def format_time(minute_of_day):
+    """Formatuje minutę doby jako "HH:MM"."""
+    return f"{minute_of_day // 60:02d}:{minute_of_day % 60:02d}"
+
+
+class Bell:
+    """Pojedynczy dzwonek odczytany z tabeli (wartości, nie referencja do tabeli)."""
+    __slots__ = ("minute", "prebellSeconds", "active")
+
+    def __init__(self, minute, prebellSeconds, active):
+        self.minute = minute                  # Minuta doby (0..1439)
+        self.prebellSeconds = prebellSeconds  # Wyprzedzenie przeddzwonka w sekundach (0 - brak)
+        self.active = active
+
+    @property
+    def hour(self):
+        return self.minute // 60
+
+    @property
+    def minuteOfHour(self):
+        return self.minute % 60
+
+    @property
+    def time(self):
+        """Godzina dzwonka jako "HH:MM"."""
+        return format_time(self.minute)
+
+    @property
+    def prebellInterval(self):
+        """Wyprzedzenie przeddzwonka w minutach (jak w pliku JSON i w GUI)."""
+        return _seconds_to_minutes(self.prebellSeconds)
+
+    def __eq__(self, other):
+        return isinstance(other, Bell) and (self.minute, self.prebellSeconds, self.active) == (other.minute, other.prebellSeconds, other.active)
+
+    def __repr__(self):
+        return f"Bell({self.time}, prebell={self.prebellSeconds}s, active={self.active})"
+
+
+def _seconds_to_minutes(seconds):
+    # Całe minuty zapisywane jako int, aby plik JSON wyglądał jak dotychczas (np. 1, a nie 1.0)
+    return seconds // 60 if seconds % 60 == 0 else seconds / 60
+
+
+def _flags_to_bits(flags):
+    """Zamienia listę flag na liczbę całkowitą (bit i - flaga i) jednym przebiegiem."""
+    if not flags:
+        return 0
+    return int("".join("1" if flag else "0" for flag in reversed(flags)), 2)
+
+
+class BellTable:
+    """
+    Zwarta tabela dzwonków: minuty doby w array('H'), wyprzedzenie przeddzwonka w sekundach
+    w array('I') i flagi aktywności jako bity jednej liczby całkowitej.
+    Plik JSON (godziny jako "HH:MM", interwały w minutach) jest tylko formatem wymiany -
+    napisy są parsowane raz, przy wczytaniu.
+    """
+    __slots__ = ("minutes", "prebellSeconds", "_active")
+
+    def __init__(self):
+        self.minutes = array('H')         # Minuta doby dzwonka
+        self.prebellSeconds = array('I')  # Wyprzedzenie przeddzwonka w sekundach
+        self._active = 0                  # Bit i ustawiony - dzwonek i aktywny
+
+    @classmethod
+    def fromJson(cls, bell_schedule, prebell_intervals, bell_active):
+        """Tworzy tabelę z list w formacie pliku JSON. Zgłasza ValueError dla nieprawidłowych danych."""
+        if not (isinstance(bell_schedule, list) and isinstance(prebell_intervals, list) and isinstance(bell_active, list)):
+            raise ValueError("bell_schedule, pre_bell_intervals i pre_bell_active muszą być listami")
+        if not (len(bell_schedule) == len(prebell_intervals) == len(bell_active)):
+            raise ValueError(f"różne długości list ({len(bell_schedule)}, {len(prebell_intervals)}, {len(bell_active)})")
+        minutes = array('H')
+        prebell_seconds = array('I')
+        parsed = {}  # Godzin "HH:MM" jest najwyżej 1440 - każda parsowana raz
+        for time_str, interval, active in zip(bell_schedule, prebell_intervals, bell_active):
+            # Wyprzedzenie krótsze niż doba (odrzuca też inf i NaN)
+            if isinstance(interval, bool) or not isinstance(interval, (int, float)) or not 0 <= interval * 60 < SECONDS_PER_DAY:
+                raise ValueError(f"nieprawidłowy interwał przeddzwonka: {interval!r}")
+            if not isinstance(active, bool):
+                raise ValueError(f"nieprawidłowy status aktywności: {active!r}")
+            minute = parsed.get(time_str) if isinstance(time_str, str) else None
+            if minute is None:
+                minute = parsed[time_str] = parse_time(time_str)
+            minutes.append(minute)
+            prebell_seconds.append(int(round(interval * 60)))
+        table = cls()
+        table.minutes = minutes
+        table.prebellSeconds = prebell_seconds
+        table._active = _flags_to_bits(bell_active)
+        return table
+
+    def toJson(self):
+        """Zwraca (bell_schedule, pre_bell_intervals, pre_bell_active) w formacie pliku JSON."""
+        return ([format_time(m) for m in self.minutes],
+                [_seconds_to_minutes(s) for s in self.prebellSeconds],
+                self.activeFlags())
+
+    def __len__(self):
+        return len(self.minutes)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.minutes)
+        return Bell(self.minutes[index], self.prebellSeconds[index], self.isActive(index))
+
+    def __iter__(self):
+        for minute, prebell_seconds, active in zip(self.minutes, self.prebellSeconds, self.activeFlags()):
+            yield Bell(minute, prebell_seconds, active)
+
+    def __eq__(self, other):
+        return (isinstance(other, BellTable) and self.minutes == other.minutes
+                and self.prebellSeconds == other.prebellSeconds and self._active == other._active)
+
+    def isActive(self, index):
+        return bool(self._active >> index & 1)
+
+    def activeFlags(self):
+        """Zwraca listę flag aktywności wszystkich dzwonków (w czasie liniowym, bez przesuwania bitów dla każdego dzwonka)."""
+        count = len(self.minutes)
+        if count == 0:
+            return []
+        bits = format(self._active, f"0{count}b")
+        return [bit == "1" for bit in reversed(bits[-count:])]
+
+    def append(self, minute, prebell_seconds, active):
+        self.insert(len(self.minutes), minute, prebell_seconds, active)
+
+    def insert(self, index, minute, prebell_seconds, active):
+        """Wstawia dzwonek na pozycję `index` (przesuwa bity aktywności kolejnych dzwonków)."""
+        self.minutes.insert(index, minute)
+        self.prebellSeconds.insert(index, prebell_seconds)
+        low = self._active & ((1 << index) - 1)
+        self._active = low | (self._active >> index << (index + 1)) | (int(bool(active)) << index)
+
+    def set(self, index, minute, prebell_seconds, active):
+        self.minutes[index] = minute
+        self.prebellSeconds[index] = prebell_seconds
+        if active:
+            self._active |= 1 << index
+        else:
+            self._active &= ~(1 << index)
+
+    def delete(self, index):
+        del self.minutes[index]
+        del self.prebellSeconds[index]
+        low = self._active & ((1 << index) - 1)
+        self._active = low | (self._active >> (index + 1) << index)
+
+    def insertSorted(self, minute, prebell_seconds, active):
+        """Wstawia dzwonek z zachowaniem kolejności godzin (za dzwonkami o tej samej godzinie). Zwraca jego indeks."""
+        index = bisect_right(self.minutes, minute)
+        self.insert(index, minute, prebell_seconds, active)
+        return index
+
+    def updateSorted(self, index, minute, prebell_seconds, active):
+        """
+        Zmienia dzwonek i przesuwa go tak, aby tabela pozostała posortowana. Zwraca nowy indeks.
+        Jeśli godzina nadal pasuje do pozycji, dzwonek zostaje na miejscu.
+        """
+        minutes = self.minutes
+        if (index == 0 or minutes[index - 1] <= minute) and (index == len(minutes) - 1 or minute <= minutes[index + 1]):
+            self.set(index, minute, prebell_seconds, active)
+            return index
+        self.delete(index)
+        return self.insertSorted(minute, prebell_seconds, active)
+
+    def sort(self):
+        """Sortuje dzwonki po godzinie (stabilnie - dzwonki o tej samej godzinie zachowują kolejność)."""
+        order = sorted(range(len(self.minutes)), key=self.minutes.__getitem__)
+        if order == list(range(len(order))):
+            return
+        minutes, prebell_seconds, flags = self.minutes, self.prebellSeconds, self.activeFlags()
+        self.minutes = array('H', (minutes[i] for i in order))
+        self.prebellSeconds = array('I', (prebell_seconds[i] for i in order))
+        self._active = _flags_to_bits([flags[i] for i in order])
+
+    def copy(self):
+        table = BellTable()
+        table.minutes = array('H', self.minutes)
+        table.prebellSeconds = array('I', self.prebellSeconds)
+        table._active = self._active
+        return table
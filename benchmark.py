@@ -0,0 +1,258 @@
+"""
+Benchmarki harmonogramu na syntetycznych danych (od MAX_BELLS do 100 tys. dzwonków).
+
+Mierzone są: koszt jednego ticku checkSchedule, kompilacja osi czasu, _sort_schedule,
+getFormattedScheduleList, odczyt i zapis pliku JSON, MainScreen._update_bell_labels oraz
+tworzenie widżetów z myLibs z liczbą czcionek Tcl (pomiary GUI tylko, gdy dostępny jest ekran
+dla Tk). Wynik jest zapisywany jako JSON, który można porównać z wynikiem poprzedniej wersji (--compare).
+
+Przykład:
+    python benchmark.py --output bench.json
+    python benchmark.py --sizes 40 1000 --compare bench.json
+"""
+from datetime import datetime
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import logging
+
+from constants import MAX_BELLS
+from bellTable import BellTable, format_time
+from clockHandling import VirtualClock
+from schedule import scheduleHandling
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_SIZES = (MAX_BELLS, 400, 4000, 40000, 100000)
+# Powyżej tej liczby dzwonków pomijany jest pomiar GUI
+DEFAULT_GUI_MAX_BELLS = 100000
+# Liczba par etykieta + przycisk tworzonych w pomiarze widżetów
+DEFAULT_WIDGET_COUNT = 200
+# Liczba ticków checkSchedule w jednym pomiarze
+_TICKS = 2000
+
+
+def generate_schedule(size, seed=0):
+    """Generuje powtarzalny, losowy harmonogram w formacie pliku JSON."""
+    rng = random.Random(seed + size)
+    minutes = [rng.randrange(6 * 60, 18 * 60) for _ in range(size)]
+    return {
+        "bell_schedule": [format_time(m) for m in minutes],
+        "pre_bell_intervals": [rng.choice((0, 0.5, 1, 2)) for _ in range(size)],
+        "pre_bell_active": [rng.random() < 0.9 for _ in range(size)],
+        "no_weekend": False,
+    }
+
+
+def _measure(func, repeat, setup=None):
+    """Wykonuje `func` `repeat` razy i zwraca statystyki czasu w milisekundach."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": min(samples), "median_ms": statistics.median(samples), "mean_ms": statistics.mean(samples), "runs": repeat}
+
+
+def _repeat_for(size):
+    """Mniej powtórzeń dla dużych harmonogramów, aby cały zestaw trwał rozsądnie."""
+    return max(3, min(50, 200000 // max(size, 1)))
+
+
+def bench_schedule(size, workdir, seed=0):
+    """Pomiary logiki harmonogramu dla jednego rozmiaru."""
+    path = os.path.join(workdir, f"schedule_{size}.json")
+    with open(path, "w") as f:
+        json.dump(generate_schedule(size, seed), f, indent=4)
+
+    clock = VirtualClock(datetime(2025, 9, 1, 5, 0, 0))
+    schedule = scheduleHandling(path, clock=clock)
+    repeat = _repeat_for(size)
+    results = {"bells": len(schedule.bells), "file_bytes": os.path.getsize(path)}
+
+    results["json_load"] = _measure(schedule._loadScheduleFromJson, repeat)
+    results["compile_timeline"] = _measure(schedule._compileTimeline, repeat)
+    results["json_save"] = _measure(lambda: schedule.saveScheduleToJson(wait=True), repeat)
+
+    # Sortowanie od zera - przed każdym pomiarem tabela jest tasowana
+    sorted_bells = schedule.bells
+    rng = random.Random(seed)
+    bells = list(sorted_bells)
+    def shuffle():
+        rng.shuffle(bells)
+        shuffled = BellTable()
+        for bell in bells:
+            shuffled.append(bell.minute, bell.prebellSeconds, bell.active)
+        schedule.bells = shuffled
+    results["sort_schedule"] = _measure(schedule._sort_schedule, repeat, setup=shuffle)
+    schedule.bells = sorted_bells
+    schedule._compileTimeline()
+
+    def invalidate():
+        schedule.version += 1
+    results["formatted_list_cold"] = _measure(schedule.getFormattedScheduleList, repeat, setup=invalidate)
+    results["formatted_list_cached"] = _measure(schedule.getFormattedScheduleList, repeat)
+
+    # Ticki co sekundę przez cały dzień szkolny - koszt nie powinien zależeć od liczby dzwonków
+    def ticks():
+        for _ in range(_TICKS):
+            clock.advance(1)
+            schedule.checkSchedule()
+    tick_stats = _measure(ticks, 3)
+    results["check_schedule_tick"] = {key: (value / _TICKS if key.endswith("_ms") else value) for key, value in tick_stats.items()}
+    return results, schedule
+
+
+def bench_gui(schedule, repeat):
+    """Pomiar MainScreen._update_bell_labels (pierwsze wypełnienie i odświeżenie bez zmian)."""
+    try:
+        import customtkinter as ctk
+        from gui import MainScreen
+        root = ctk.CTk()
+    except Exception as e:
+        return {"skipped": f"brak Tk/ekranu: {e}"}
+    try:
+        root.withdraw()
+        screen = MainScreen(root)
+        formatted = schedule.getFormattedScheduleList()
+        first = _measure(lambda: (screen._update_bell_labels(formatted), root.update_idletasks()), 1)
+        refresh = _measure(lambda: (screen._update_bell_labels(formatted), root.update_idletasks()), repeat)
+        return {"update_bell_labels_first": first, "update_bell_labels_refresh": refresh}
+    finally:
+        root.destroy()
+
+
+def bench_widgets(count=DEFAULT_WIDGET_COUNT):
+    """
+    Czas tworzenia niestandardowych widżetów i liczba czcionek Tcl: z nową czcionką dla każdego
+    widżetu (jak przed wprowadzeniem myLibs.get_font) oraz ze wspólnymi czcionkami.
+    """
+    try:
+        import customtkinter as ctk
+        from myLibs import MyLabel, MyButton, MySpinbox
+        root = ctk.CTk()
+    except Exception as e:
+        return {"skipped": f"brak Tk/ekranu: {e}"}
+    try:
+        root.withdraw()
+
+        def create(fresh_fonts):
+            frame = ctk.CTkFrame(root)
+            fonts_before = len(root.tk.call("font", "names"))
+            start = time.perf_counter()
+            for _ in range(count):
+                for widget in (MyLabel, MyButton):
+                    if fresh_fonts:
+                        widget(frame, text="Dzwonek", font=ctk.CTkFont(family="Calibri", size=22, weight="bold"))
+                    else:
+                        widget(frame, text="Dzwonek")
+            root.update_idletasks()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            result = {"widgets": 2 * count, "total_ms": elapsed_ms, "per_widget_ms": elapsed_ms / (2 * count),
+                      "tcl_fonts_added": len(root.tk.call("font", "names")) - fonts_before}
+            frame.destroy()
+            return result
+
+        spinbox_frame = ctk.CTkFrame(root)
+        spinbox = _measure(lambda: MySpinbox(spinbox_frame), max(1, count // 10))
+        spinbox_frame.destroy()
+        return {"fresh_fonts": create(True), "shared_fonts": create(False), "spinbox_create": spinbox}
+    finally:
+        root.destroy()
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes, gui_max_bells=DEFAULT_GUI_MAX_BELLS, seed=0, widget_count=DEFAULT_WIDGET_COUNT):
+    """Uruchamia wszystkie pomiary i zwraca wynik (słownik gotowy do zapisu jako JSON)."""
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="bell_bench_") as workdir:
+        for size in sizes:
+            print(f"Rozmiar {size}...", file=sys.stderr)
+            results, schedule = bench_schedule(size, workdir, seed)
+            if size <= gui_max_bells:
+                results["gui"] = bench_gui(schedule, _repeat_for(size))
+            else:
+                results["gui"] = {"skipped": f"ponad {gui_max_bells} dzwonków"}
+            report["sizes"][str(size)] = results
+    report["widgets"] = bench_widgets(widget_count)
+    return report
+
+
+def compare(report, baseline):
+    """Zwraca linie porównania mediany czasów z poprzednim wynikiem (stosunek nowy/stary)."""
+    lines = []
+    for size, results in report["sizes"].items():
+        old_results = baseline.get("sizes", {}).get(size)
+        if old_results is None:
+            continue
+        flat_new = _flatten(results)
+        flat_old = _flatten(old_results)
+        for name, value in flat_new.items():
+            old = flat_old.get(name)
+            if old:
+                lines.append(f"{size:>7} {name:<45} {old:10.4f} ms -> {value:10.4f} ms  x{value / old:.2f}")
+    return lines
+
+
+def _flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            if "median_ms" in value:
+                flat[prefix + key] = value["median_ms"]
+            else:
+                flat.update(_flatten(value, prefix + key + "."))
+    return flat
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarki harmonogramu dzwonków")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="liczby dzwonków do zmierzenia")
+    parser.add_argument("--gui-max", type=int, default=DEFAULT_GUI_MAX_BELLS, help="maksymalna liczba dzwonków dla pomiaru GUI")
+    parser.add_argument("--widgets", type=int, default=DEFAULT_WIDGET_COUNT, help="liczba par etykieta + przycisk w pomiarze widżetów")
+    parser.add_argument("--seed", type=int, default=0, help="ziarno generatora harmonogramów")
+    parser.add_argument("--output", metavar="PLIK", help="zapisz wynik do pliku JSON (domyślnie wypisz)")
+    parser.add_argument("--compare", metavar="PLIK", help="porównaj z wcześniejszym wynikiem")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    logging.disable(logging.INFO) # Moduły ustawiają poziom INFO - w pomiarach tylko ostrzeżenia i błędy
+
+    report = run_benchmarks(args.sizes, args.gui_max, args.seed, args.widgets)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        print("\n".join(compare(report, baseline)), file=sys.stderr)
@@ -0,0 +1,32 @@
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class BootTimer:
+    """
+    Czasy etapów uruchamiania aplikacji (np. wczytanie harmonogramu, pierwszy tick planisty,
+    ekran logowania), liczone od `start` na zegarze monotonicznym.
+    Każdy etap jest zapisywany raz - kolejne wywołania mark() dla tej samej nazwy są ignorowane.
+    """
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.monotonic()
+        self.phases = {}  # Nazwa etapu -> sekundy od startu
+        self._lock = threading.Lock()
+
+    def mark(self, phase):
+        """Zapisuje zakończenie etapu (bezpieczne z dowolnego wątku)."""
+        elapsed = time.monotonic() - self.start
+        with self._lock:
+            if phase in self.phases:
+                return
+            self.phases[phase] = elapsed
+        logger.info(f"Uruchamianie: {phase} po {elapsed * 1000:.0f} ms")
+
+    def summary(self):
+        """Zwraca etapy w kolejności wystąpienia: nazwa -> milisekundy od startu."""
+        with self._lock:
+            return {phase: round(elapsed * 1000, 1) for phase, elapsed in sorted(self.phases.items(), key=lambda item: item[1])}
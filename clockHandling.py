@@ -1,11 +1,67 @@
 import platform
 import os
 import datetime
+import time
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+
+class SystemClock:
+    """
+    Zegar systemowy. Moduły pobierają czas przez obiekt zegara (a nie bezpośrednio
+    z datetime.now()), aby w symulacji można było podstawić VirtualClock.
+    """
+    def now(self):
+        """Czas lokalny (datetime)."""
+        return datetime.datetime.now()
+
+    def time(self):
+        """Czas ścienny w sekundach (jak time.time())."""
+        return time.time()
+
+    def monotonic(self):
+        """Czas monotoniczny w sekundach (jak time.monotonic())."""
+        return time.monotonic()
+
+
+class VirtualClock:
+    """
+    Zegar wirtualny - czas płynie tylko po wywołaniu advance()/set().
+    Pozwala przejść dzień, tydzień czy rok harmonogramu w kilka sekund.
+    """
+    def __init__(self, start):
+        self._now = start
+        self._monotonic = 0.0
+        self._lock = threading.Lock()
+
+    def now(self):
+        return self._now
+
+    def time(self):
+        return self._now.timestamp()
+
+    def monotonic(self):
+        return self._monotonic
+
+    def advance(self, seconds):
+        """Przesuwa czas o podaną liczbę sekund."""
+        with self._lock:
+            self._now += datetime.timedelta(seconds=seconds)
+            self._monotonic += seconds
+
+    def set(self, new_now):
+        """Ustawia czas (może cofnąć zegar, jak zmiana czasu systemowego - zegar monotoniczny nie cofa się)."""
+        with self._lock:
+            self._monotonic += max(0.0, (new_now - self._now).total_seconds())
+            self._now = new_now
+
+
+# Zegar używany domyślnie przez wszystkie moduły
+systemClock = SystemClock()
+
 def set_system_time(hour: int, minute: int) -> bool:
     """
     Ustawia czas systemowy na podaną godzinę i minutę.
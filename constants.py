@@ -9,4 +9,34 @@ AUTH_PATH_LINUX = "/bellCache/auth.json"
 LOGS_PATH_LINUX = "/tmp/logs"
 DEFAULT_BELL_INTERVAL = 1
 MAX_MUSIC_LEN = 15
-MAX_BELLS = 40
+MAX_BELLS = 40  # Domyślny limit dzwonków przy dodawaniu - plik harmonogramu może go zmienić polem "max_bells"
+# Górna granica limitu i liczby dzwonków w pliku (większy plik jest odrzucany - ogranicza czas wczytania)
+MAX_BELLS_LIMIT = 100000
+
+AMP_ON_LEAD_SECONDS = 10
+AMP_OFF_DELAY_SECONDS = 20
+SCHEDULER_MODE = "deadline"  # "deadline" - timer ustawiany na najbliższe zdarzenie, "poll" - sprawdzanie co sekundę
+MAX_SCHEDULER_SLEEP_SECONDS = 60
+# Dzwonek/przeddzwonek spóźniony o więcej niż tyle sekund jest pomijany (powinno być < AMP_OFF_DELAY_SECONDS)
+MAX_EVENT_LATENESS_SECONDS = 15
+EVENT_LATE_THRESHOLD_SECONDS = 1
+SCHEDULER_THREAD_NICE = -10
+CONTROL_SOCKET_PATH = "/tmp/bell.sock"
+SOUND_CACHE_MAX_BYTES = 64 * 1024 * 1024
+SOUND_INDEX_POLL_SECONDS = 5
+METADATA_INDEX_PATH_LINUX = "/bellCache/mp3_index.json"
+TIMING_STATS_PATH_LINUX = "/bellCache/timing_stats.json"
+RELAY_BACKEND = "auto"  # "auto", "rpi" (RPi.GPIO), "fake" (fake_rpi) lub "recorder" (tylko w pamięci)
+# Przerwy między oknami włączenia wzmacniacza krótsze lub równe tej wartości są scalane (wzmacniacz pozostaje włączony)
+AMP_MERGE_GAP_SECONDS = 120
+# Zmiany harmonogramu są zapisywane na kartę SD jednym zapisem po tylu sekundach bez kolejnych zmian
+SCHEDULE_SAVE_DEBOUNCE_SECONDS = 1.0
+# Co ile sekund sprawdzać zmianę pliku harmonogramu, gdy inotify jest niedostępne
+SCHEDULE_WATCH_POLL_SECONDS = 5
+# Dziennik: komunikaty DEBUG są odrzucane, gdy w kolejce czeka ich więcej niż LOG_DEBUG_DROP_THRESHOLD,
+# INFO - powyżej LOG_QUEUE_MAX_RECORDS (ostrzeżenia i błędy nigdy)
+LOG_QUEUE_MAX_RECORDS = 10000
+LOG_DEBUG_DROP_THRESHOLD = 1000
+# Wątek dziennika zapisuje paczkami: do tylu komunikatów lub po tylu sekundach
+LOG_BATCH_MAX_RECORDS = 200
+LOG_BATCH_INTERVAL_SECONDS = 0.5
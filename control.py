@@ -0,0 +1,109 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class ControlServer:
+    """
+    Minimalny interfejs sterowania przez gniazdo Unix (tryb bez GUI).
+    Każde połączenie wysyła jedną komendę tekstową zakończoną nową linią
+    i otrzymuje jedną linię odpowiedzi w formacie JSON.
+
+    Komendy: status, timing, bell, prebell, alarm, stop, amp on, amp off, help
+    """
+    COMMANDS = ("status", "timing", "bell", "prebell", "alarm", "stop", "amp on", "amp off", "help")
+
+    def __init__(self, socket_path, schedule, music, scheduler):
+        self.socket_path = socket_path
+        self.schedule = schedule
+        self.music = music
+        self.scheduler = scheduler
+        self._server = None
+
+    def start(self):
+        """Tworzy gniazdo i obsługuje komendy w osobnym wątku."""
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path) # Pozostałość po poprzednim uruchomieniu
+        server_self = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                command = self.rfile.readline().decode("utf-8").strip()
+                response = server_self.execute(command)
+                self.wfile.write((json.dumps(response, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, _Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="ControlServer", daemon=True).start()
+        logger.info(f"Gniazdo sterujące nasłuchuje na: {self.socket_path}")
+
+    def stop(self):
+        """Zamyka gniazdo sterujące."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def execute(self, command):
+        """Wykonuje komendę i zwraca słownik z odpowiedzią."""
+        logger.info(f"Komenda sterująca: {command}")
+        try:
+            if command == "status":
+                snapshot = self.scheduler.snapshot()
+                return {
+                    "ok": True,
+                    "nextOccurrence": snapshot.nextOccurrence,
+                    "nextEventTime": snapshot.nextEventTime,
+                    "eventStats": snapshot.eventStats,
+                    "bells": len(self.schedule.bells),
+                    "maxBells": self.schedule.maxBells,
+                    "noWeekend": self.schedule.noWeekend,
+                    "playing": self.music.is_playing(),
+                    "relay": {"state": self.music.relay.state, "writes": self.music.relay.writes, "skipped": self.music.relay.skipped},
+                }
+            if command == "timing":
+                return {"ok": True, "timing": self.scheduler.timing.summary()}
+            if command == "bell":
+                self.music.playBell()
+            elif command == "prebell":
+                self.music.playPrebell()
+            elif command == "alarm":
+                self.music._amp_relay(state=True)
+                self.music.playAlarm()
+            elif command == "stop":
+                self.music.stopMusic()
+            elif command == "amp on":
+                self.music._amp_relay(state=True)
+            elif command == "amp off":
+                self.music._amp_relay(state=False)
+            elif command == "help":
+                return {"ok": True, "commands": list(self.COMMANDS)}
+            else:
+                return {"ok": False, "error": f"Nieznana komenda: {command}"}
+            return {"ok": True}
+        except Exception as e:
+            logger.error(f"Błąd wykonania komendy '{command}': {e}")
+            return {"ok": False, "error": str(e)}
+
+
+def send_command(socket_path, command, timeout=5):
+    """Wysyła komendę do działającej instancji i zwraca odpowiedź (słownik)."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((command + "\n").encode("utf-8"))
+        response = b""
+        while not response.endswith(b"\n"):
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            response += chunk
+    return json.loads(response.decode("utf-8"))
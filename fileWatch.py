@@ -0,0 +1,127 @@
+import os
+import threading
+import logging
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+_MOUNTS_FILE = "/proc/self/mounts"
+# Czas zbierania kolejnych zdarzeń po pierwszej zmianie (np. montowanie pendrive'a generuje ich wiele)
+_DEBOUNCE_SECONDS = 0.5
+
+
+class PathWatcher:
+    """
+    Obserwuje zestaw katalogów (lub plików) i wywołuje `callback()` po wykryciu zmiany.
+
+    Jeśli dostępna jest biblioteka inotify_simple, zmiany są zgłaszane przez jądro (inotify);
+    dla pliku obserwowany jest katalog, w którym się znajduje (plik podmieniany przez
+    zmianę nazwy dostaje nowy i-węzeł). W przeciwnym razie, co `poll_interval` sekund,
+    sprawdzany jest tylko stat() obserwowanych ścieżek (mtime, rozmiar, urządzenie, i-węzeł)
+    - bez przechodzenia całego drzewa.
+    W obu trybach wykrywane jest też montowanie/odmontowanie nośników (/proc/self/mounts).
+    """
+    def __init__(self, callback, poll_interval, name="PathWatcher"):
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.name = name
+        self._paths = set()
+        self._signature = {}
+        self._mounts = self._read_mounts()
+        self._stop = threading.Event()
+        self._inotify = None
+        self._watches = {}  # ścieżka -> deskryptor obserwacji inotify
+        if INotify is not None:
+            try:
+                self._inotify = INotify()
+            except OSError as e:
+                logger.warning(f"{self.name}: inotify niedostępne ({e}), używam odpytywania.")
+
+    def watch(self, paths):
+        """Ustawia zestaw obserwowanych katalogów i plików (zastępuje poprzedni)."""
+        paths = set(paths)
+        directories = set(p if os.path.isdir(p) else os.path.dirname(os.path.abspath(p)) for p in paths)
+        directories = set(p for p in directories if os.path.isdir(p))
+        if self._inotify is not None:
+            mask = (inotify_flags.CREATE | inotify_flags.DELETE | inotify_flags.MOVED_FROM | inotify_flags.MOVED_TO |
+                    inotify_flags.CLOSE_WRITE | inotify_flags.DELETE_SELF | inotify_flags.UNMOUNT)
+            for path in set(self._watches) - directories:
+                try:
+                    self._inotify.rm_watch(self._watches.pop(path))
+                except OSError:
+                    pass # Obserwacja usunięta już przez jądro (np. po odmontowaniu)
+            for path in directories - set(self._watches):
+                try:
+                    self._watches[path] = self._inotify.add_watch(path, mask)
+                except OSError as e:
+                    logger.warning(f"{self.name}: nie można obserwować {path}: {e}")
+        self._paths = paths
+        self._signature = self._stat_signature(paths)
+
+    def start(self, initial_callback=False):
+        """Uruchamia wątek obserwacji. `initial_callback=True` - wątek najpierw wywołuje `callback()` (np. pierwsze indeksowanie)."""
+        threading.Thread(target=self._run, args=(initial_callback,), name=self.name, daemon=True).start()
+        logger.info(f"{self.name}: obserwacja zmian ({'inotify' if self._inotify is not None else 'odpytywanie'}).")
+
+    def stop(self):
+        self._stop.set()
+
+    @staticmethod
+    def _stat_signature(paths):
+        signature = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+                signature[path] = (st.st_mtime_ns, st.st_size, st.st_dev, st.st_ino)
+            except OSError:
+                signature[path] = None
+        return signature
+
+    @staticmethod
+    def _read_mounts():
+        try:
+            with open(_MOUNTS_FILE, "r") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _changed(self):
+        """Czeka do `poll_interval` sekund na zmianę; zwraca True, jeśli ją wykryto."""
+        changed = False
+        if self._inotify is not None:
+            if self._inotify.read(timeout=int(self.poll_interval * 1000)):
+                # Zbierz resztę zdarzeń z tej samej serii
+                while self._inotify.read(timeout=int(_DEBOUNCE_SECONDS * 1000)):
+                    pass
+                changed = True
+        else:
+            if self._stop.wait(self.poll_interval):
+                return False
+            signature = self._stat_signature(self._paths)
+            changed = signature != self._signature
+            self._signature = signature
+
+        mounts = self._read_mounts()
+        if mounts != self._mounts:
+            self._mounts = mounts
+            changed = True
+        return changed
+
+    def _run(self, initial_callback=False):
+        if initial_callback:
+            try:
+                self.callback()
+            except Exception as e:
+                logger.error(f"{self.name}: błąd obserwacji zmian: {e}")
+        while not self._stop.is_set():
+            try:
+                if self._changed() and not self._stop.is_set():
+                    self.callback()
+            except Exception as e:
+                logger.error(f"{self.name}: błąd obserwacji zmian: {e}")
+                self._stop.wait(self.poll_interval)
@@ -1,11 +1,10 @@
 import customtkinter as ctk
-from datetime import datetime
 import clockHandling 
-import time
-import threading
+import queue
 import logging
 import auth
-from myLibs import NotificationPopup, MyButton, MyLabel, MySpinbox, ScheduleButton
+from myLibs import NotificationOverlay, MyButton, MyLabel, MySpinbox, ScheduleButton, VirtualList, get_font
+from viewModel import RenderGate
 
 
 logger = logging.getLogger(__name__)
@@ -20,10 +19,12 @@ class BellApp(ctk.CTk):
     Główna klasa aplikacji dzwonkowej.
     Zarządza ramkami, nawigacją, zegarem systemowym i logiką wygaszacza ekranu.
     """
-    def __init__(self, music, schedule, screensaver_time, auth_handler):
+    def __init__(self, music, schedule, screensaver_time, auth_handler, scheduler, clock=None, boot=None):
         super().__init__()
         self.music = music
         self.schedule = schedule
+        self.scheduler = scheduler
+        self.clock = clock if clock is not None else schedule.clock # Źródło czasu dla zegarów i wygaszacza
         self.screensaver_time = screensaver_time 
         self.auth = auth_handler
 
@@ -34,13 +35,17 @@ class BellApp(ctk.CTk):
 
         self.frames = {} 
         self.current_frame_name = None
+        self._notification_overlay = None # Okno komunikatów, tworzone przy pierwszym komunikacie
 
         self.create_tab_buttons()
         self.create_frames()
 
         self.show_frame("login")
-        
-        self.last_activity_time = time.time()
+        if boot is not None:
+            # Wywołane po obsłużeniu zadań rysowania zaplanowanych wcześniej - ekran logowania jest już widoczny
+            self.after_idle(lambda: boot.mark("login_screen"))
+
+        self.last_activity_time = self.clock.time()
         self.bind_all("<Button>", self._reset_inactivity_timer)
         self.bind_all("<Key>", self._reset_inactivity_timer)
         self.after(1000, self._check_inactivity)
@@ -68,29 +73,53 @@ class BellApp(ctk.CTk):
                 height=80,
                 hover=False,
                 fg_color="#1f538d",
-                font=ctk.CTkFont(family="Calibri", size=24, weight="bold"),
+                font=get_font(size=24, weight="bold"),
                 command=lambda n=name: self.show_frame(n),
             ).pack(side="left", fill="both", expand=True, padx=3, pady=5)
 
 
     def create_frames(self):
-        """Tworzy instancje wszystkich ramek aplikacji."""
-        self.frames["login"] = LoginScreen(self, self.auth)
-        self.frames["main"] = MainScreen(self)
-        self.frames["sounds"] = SoundSettings(self)
-        self.frames["schedule"] = ScheduleTab(self, self.schedule)
-        self.frames["clock"] = ClockTab(self)
-        self.frames["security"] = SecurityTab(self, self.auth)
-        self.frames["screensaver"] = ScreensaverFrame(self)
-        self.frames["popup"] = PopupFrame(self)
-
-        # Umieszczenie wszystkich ramek w tym samym miejscu, aby można było je przełączać
-        for frame in self.frames.values():
-            if frame != self.frames["screensaver"] and frame != self.frames["login"]: 
+        """
+        Rejestruje ramki aplikacji. Ramka jest tworzona dopiero przy pierwszym wyświetleniu (get_frame) -
+        przy starcie powstaje tylko ekran logowania.
+        """
+        self._frame_factories = {
+            "login": lambda: LoginScreen(self, self.auth),
+            "main": lambda: MainScreen(self),
+            "sounds": lambda: SoundSettings(self),
+            "schedule": lambda: ScheduleTab(self, self.schedule),
+            "clock": lambda: ClockTab(self),
+            "security": lambda: SecurityTab(self, self.auth),
+            "screensaver": lambda: ScreensaverFrame(self),
+            "popup": lambda: PopupFrame(self),
+        }
+
+    def get_frame(self, name):
+        """Zwraca ramkę o podanej nazwie, tworząc ją przy pierwszym użyciu."""
+        frame = self.frames.get(name)
+        if frame is None:
+            frame = self._frame_factories[name]()
+            # Wszystkie ramki w tym samym miejscu, aby można było je przełączać
+            if name != "screensaver" and name != "login":
                 frame.place(x=0, y=90, relwidth=1, relheight=1) # Ramki pod paskiem przycisków
             else:
                 frame.place(x=0, y=0, relwidth=1, relheight=1) # Wygaszacz ekranu zajmuje cały ekran
+            self.frames[name] = frame
+            logger.info(f"Utworzono ramkę: {name}")
+        return frame
+
+    def refresh_main_screen(self):
+        """Odświeża ekran główny po zmianie harmonogramu (jeśli już został utworzony - inaczej zrobi to show_frame)."""
+        main = self.frames.get("main")
+        if main is not None:
+            main.update_display(self.scheduler.snapshot().nextOccurrence, self.schedule.getFormattedScheduleList(), self.schedule.version)
     
+    def notify(self, message, color="white", duration_ms=2500):
+        """Wyświetla komunikat na całym ekranie (bez blokowania pętli Tk; kolejne komunikaty czekają w kolejce)."""
+        if self._notification_overlay is None:
+            self._notification_overlay = NotificationOverlay(self)
+        self._notification_overlay.show(message, duration_ms, color)
+
     def unlock_application(self):
         """Wywoływane po poprawnym wpisaniu PINu."""
         logger.info("Zalogowano pomyślnie.")
@@ -101,10 +130,11 @@ class BellApp(ctk.CTk):
         Pokazuje wybraną ramkę i ukrywa pozostałe.
         Odświeża dane na ekranie głównym i zegarze przy wejściu na nie.
         """
-        if name not in self.frames:
+        if name not in self._frame_factories:
             logger.error(f"Próba wyświetlenia nieistniejącej ramki: {name}")
             return
 
+        self.get_frame(name)
         for frame_name, frame_obj in self.frames.items():
             if frame_name == name:
                 frame_obj.lift() # Podnieś wybraną ramkę na wierzch
@@ -119,12 +149,14 @@ class BellApp(ctk.CTk):
 
         # Odświeżanie danych na ekranach tylko przy wejściu na nie
         if name == "main":
-            self.frames["main"].update_display(self.schedule.nextOccurrence, self.schedule.getFormattedScheduleList())
+            self.refresh_main_screen()
         if name == "clock":
             self.frames["clock"].update_time()
+        if name == "sounds":
+            self.frames["sounds"].refresh()
 
     def _reset_inactivity_timer(self, event=None):
-        self.last_activity_time = time.time()
+        self.last_activity_time = self.clock.time()
         # Jeśli jesteśmy na screensaverze, wróć do logowania (bezpieczniej) lub do main
         # Tutaj decyzja projektowa: Czy po wygaszaczu trzeba znowu podać hasło?
         # Zazwyczaj w takich systemach nie, chyba że to ścisła kontrola.
@@ -138,57 +170,67 @@ class BellApp(ctk.CTk):
             logger.info("Wyjście z wygaszacza -> powrót do logowania.")
     def _update_main_loop(self):
         """
-        Główna pętla aktualizująca stan aplikacji co sekundę.
-        Odpowiada za logikę dzwonienia i aktualizację wygaszacza ekranu.
-        Nie odświeża ciągle listy dzwonków na ekranie głównym.
+        Główna pętla aktualizująca widoki aplikacji co sekundę (zegar, wygaszacz, przyciski).
+        Logika dzwonienia działa niezależnie w wątku BellScheduler - tutaj tylko odczytujemy
+        jego migawkę stanu i kolejkę zdarzeń.
+        Odświeżana jest tylko widoczna ramka, a jej widżety - tylko po zmianie wyświetlanych danych.
         """
-        self.schedule.checkSchedule() # Model harmonogramu aktualizuje swój stan dzwonków
-        
+        self._process_scheduler_events()
+        snapshot = self.scheduler.snapshot()
+
         # Widok screensavera musi się odświeżać co sekundę, bo pokazuje aktualny czas
         if self.current_frame_name == "screensaver":
-            self.frames["screensaver"].update_clock(self.schedule.nextOccurrence)
+            self.frames["screensaver"].update_clock(snapshot.nextOccurrence)
         if self.current_frame_name == "clock":
              self.frames["clock"].update_time()
-             
-        # Sprawdź flagi `timeTo` z harmonogramu i wykonaj odpowiednie akcje
-        # Flagi są resetowane w schedule.checkSchedule(), więc akcja wyzwoli się tylko raz
-        if self.schedule.timeTo["turnAmpOn"]:
-            self.music._amp_relay(state=True)
-            logger.info("Włączono wzmacniacz.")
-        
-        if self.schedule.timeTo["playPrebell"]:
-            self.music.playPrebell()
-            logger.info("Odtworzono przeddzwonek.")
-
-        if self.schedule.timeTo["playBell"]:
-            self.music.playBell()
-            logger.info("Odtworzono dzwonek.")
-        
-        if self.schedule.timeTo["turnAmpOff"]:
-            self.music._amp_relay(state=False)
-            logger.info("Wyłączono wzmacniacz.")
-
-        self.frames["sounds"]._update_button_texts()
+        if self.current_frame_name == "main":
+            self.frames["main"].refresh_next_occurrence(self.schedule.nextOccurrenceState)
+        if self.current_frame_name == "sounds":
+            self.frames["sounds"].refresh()
         
         self.after(1000, self._update_main_loop) # Zaplanuj kolejne wywołanie po 1 sekundzie
 
+    def _process_scheduler_events(self):
+        """Odbiera zdarzenia z kolejki planisty dzwonków (bez blokowania pętli Tk)."""
+        while True:
+            try:
+                kind, value = self.scheduler.events.get_nowait()
+            except queue.Empty:
+                return
+            if kind == "scheduleReloaded": # Następny dzwonek odświeża _update_main_loop (nextOccurrenceState)
+                self._on_schedule_reloaded()
+
+    def _on_schedule_reloaded(self):
+        """Odświeża widoki po wczytaniu zmienionego pliku harmonogramu (tylko gdy zawartość się zmieniła)."""
+        self.refresh_main_screen()
+        # Ramki jeszcze nieutworzone wczytają aktualny harmonogram przy pierwszym wyświetleniu
+        schedule_tab = self.frames.get("schedule")
+        if schedule_tab is not None and self.schedule.bells:
+            schedule_tab._display_bell_at_index(min(schedule_tab.current_index, len(self.schedule.bells) - 1))
+        sounds = self.frames.get("sounds")
+        if sounds is not None:
+            sounds._update_weekend_button_text()
+        logger.info("Odświeżono widoki po zmianie pliku harmonogramu.")
+
     def _on_close(self):
         """Obsługa zamykania okna aplikacji: zapisuje harmonogram i zatrzymuje muzykę."""
-        self.schedule.saveScheduleToJson()
-        self.music.stopMusic() 
+        self.schedule.stopWatching()
+        self.scheduler.stop()
+        self.schedule.saveScheduleToJson(wait=True)
+        self.music.stopMusic(wait=True) 
         logger.info("Aplikacja zamykana.")
         self.destroy()
     
     def _reset_inactivity_timer(self, event=None):
         """Resetuje licznik bezczynności i wychodzi z wygaszacza ekranu, jeśli jest aktywny."""
-        self.last_activity_time = time.time()
+        self.last_activity_time = self.clock.time()
         if self.current_frame_name == "screensaver":
             self.show_frame("login")
             logger.info("Wykryto aktywność, powrót z wygaszacza ekranu.")
 
     def _check_inactivity(self):
         """Sprawdza bezczynność użytkownika i włącza wygaszacz ekranu po określonym czasie."""
-        if time.time() - self.last_activity_time > self.screensaver_time:
+        if self.clock.time() - self.last_activity_time > self.screensaver_time:
             if self.current_frame_name != "screensaver":
                 self.show_frame("screensaver")
                 logger.info(f"Brak aktywności przez {self.screensaver_time}s, włączanie wygaszacza ekranu.")
@@ -207,67 +249,40 @@ class MainScreen(ctk.CTkFrame):
         self.next_time_label = MyLabel(self.top_frame, text="Następny dzwonek: --:--")
         self.next_time_label.pack(fill="x", pady=3)
 
-        self.schedule_display_frame = ctk.CTkScrollableFrame(self, height=330)
-        self.schedule_display_frame._scrollbar.configure(width=30, hover=False)
-        self.schedule_display_frame.pack(fill="both", pady=5, padx=2)
-        
+        # Etykiety tylko dla widocznych wierszy (6 x 2), używane ponownie przy przewijaniu
+        self.schedule_list = VirtualList(self, visible_rows=6, columns=2, row_height=55)
+        self.schedule_list.pack(fill="both", pady=5, padx=2)
 
-        self.bell_labels = [] # Lista do przechowywania referencji do etykiet dzwonków
+        self._shown_version = None # Wersja harmonogramu widoczna w etykietach
+        self._next_gate = None # Wersja opisu następnego dzwonka widoczna w etykiecie
 
-    def update_display(self, next_occurrence, formatted_schedule_list):
+    def update_display(self, next_occurrence, formatted_schedule_list, version=None):
         """
         Aktualizuje wyświetlanie następnego dzwonka i listy dzwonków.
         Wywoływane tylko przy wejściu na ten ekran, aby uniknąć migotania.
+        `version` - wersja harmonogramu; jeśli się nie zmieniła, etykiety dzwonków nie są odświeżane.
         """
-        self.next_time_label.configure(text= next_occurrence)
-        self._update_bell_labels(formatted_schedule_list)
+        if self.next_time_label.cget("text") != next_occurrence:
+            self.next_time_label.configure(text= next_occurrence)
+        if version is None or version != self._shown_version:
+            self._update_bell_labels(formatted_schedule_list)
+            self._shown_version = version
         logger.debug("MainScreen: Odświeżono wyświetlanie.")
+
+    def refresh_next_occurrence(self, next_occurrence_state):
+        """Odświeża etykietę następnego dzwonka tylko po zmianie `next_occurrence_state` (viewModel.Observable)."""
+        if self._next_gate is None:
+            self._next_gate = RenderGate(next_occurrence_state)
+        if self._next_gate.changed() and self.next_time_label.cget("text") != next_occurrence_state.value:
+            self.next_time_label.configure(text=next_occurrence_state.value)
+
     def _update_bell_labels(self, formatted_schedule_list):
         """
-        Aktualizuje etykiety dzwonków z równym formatowaniem kolumnowym,
-        rozmieszczając je w dwóch głównych kolumnach.
+        Aktualizuje listę dzwonków (dwie kolumny). Lista ma etykiety tylko dla widocznych wierszy,
+        więc czas odświeżenia nie zależy od liczby dzwonków.
         """
-        num_entries = len(formatted_schedule_list)
-        num_rows = (num_entries + 1) // 2  # liczba wierszy potrzebna do 2-kolumnowego układu
-
-        # Upewnij się, że `bell_labels` ma wystarczającą liczbę etykiet (w układzie [ [label1, label2], ... ])
-        while len(self.bell_labels) < num_rows:
-            row_labels = []
-            for col in range(2):  # 2 kolumny
-                frame = ctk.CTkFrame(self.schedule_display_frame, corner_radius=0)
-                frame.grid(row=len(self.bell_labels), column=col, padx=5, pady=2, sticky="nsew")
-
-                label = MyLabel(frame, text="", anchor="center", corner_radius=5)
-                label.pack(fill="both", expand=True, padx=5, pady=3)
-
-                row_labels.append(label)
-            self.bell_labels.append(row_labels)
-
-        # Aktualizuj/ustaw dane w etykietach
-        for idx, entry in enumerate(formatted_schedule_list):
-            row = idx // 2
-            col = idx % 2
-            label = self.bell_labels[row][col]
-            if label.cget("text") != entry:
-                label.configure(text=entry)
-            label.master.grid()  # pokaż frame jeśli był ukryty
-            label.master.grid_rowconfigure(0, weight=1)
-
-        # Ukryj nadmiarowe etykiety (jeśli np. wcześniej było więcej)
-        for idx in range(num_entries, len(self.bell_labels) * 2):
-            row = idx // 2
-            col = idx % 2
-            label = self.bell_labels[row][col]
-            label.configure(text="")
-            label.master.grid_remove()  # ukryj frame
-
-        # Ustaw wagę wierszy i kolumn, by równo się rozciągały
-        for row in range(num_rows):
-            self.schedule_display_frame.grid_rowconfigure(row, weight=1)
-        self.schedule_display_frame.grid_columnconfigure(0, weight=1)
-        self.schedule_display_frame.grid_columnconfigure(1, weight=1)
-
-        logger.debug(f"Zaktualizowano etykiety dzwonków: {num_entries} pozycji, {num_rows} wierszy.")
+        self.schedule_list.set_items(formatted_schedule_list)
+        logger.debug(f"Zaktualizowano listę dzwonków: {len(formatted_schedule_list)} pozycji.")
 
 class SoundSettings(ctk.CTkFrame):
     """
@@ -329,27 +344,53 @@ class SoundSettings(ctk.CTkFrame):
                                         text="Zmiana hasła",
                                         command=lambda: self.master.show_frame("security"))
         self.btnOpenSecurity.pack(pady=10, fill="y")
-                        
-        self._update_button_texts() # Upewnij się, że tekst przycisków jest aktualny przy inicjalizacji
-        
-        self.lbInfo = MyLabel(self, text="Autor: Grzegorz Serwin | Wersja programu: 1.0.0", font=ctk.CTkFont(family="Calibri", size=12, weight="bold"))
+
+        # Teksty przycisków zależą tylko od stanu odtwarzania i znalezionych plików
+        self._buttons_gate = RenderGate(master.music.playingRole, master.music.soundFiles)
+
+        # Opóźnienia dzwonków względem harmonogramu (p50/p99/max)
+        self.lbTiming = MyLabel(self, text="", font=get_font(size=14))
+        self.lbTiming.pack(pady=5)
+        self.refresh() # Ustaw początkowe teksty przycisków i opóźnień
+
+        self.lbInfo = MyLabel(self, text="Autor: Grzegorz Serwin | Wersja programu: 1.0.0", font=get_font(size=12, weight="bold"))
         self.lbInfo.pack(pady=10)
+
+    def refresh(self):
+        """
+        Odświeża ekran (co sekundę, gdy jest widoczny). Przyciski są przebudowywane tylko po zmianie
+        stanu odtwarzania lub plików dźwiękowych.
+        """
+        if self._buttons_gate.changed():
+            self._update_button_texts()
+        self.update_timing()
+
+    def update_timing(self):
+        """Odświeża podsumowanie opóźnień dzwonków i przeddzwonków."""
+        text = self.master.scheduler.timing.formatSummary(kinds=("playBell", "playPrebell"))
+        if self.lbTiming.cget("text") != text:
+            self.lbTiming.configure(text=text)
         
     def _update_button_texts(self):
         """
         Aktualizuje teksty i kolory przycisków odtwarzania dźwięków
         w zależności od aktualnego stanu odtwarzania (czy coś gra, czy alarm).
         """
-        if self.master.music._is_alarm_playing:
-            self.btnStartAlarm.configure(text=f"Zatrzymaj alarm\n{self.master.music.musicFileNameAlarm}", fg_color="#990000")
+        music = self.master.music
+        if music.playingRole.value == "alarm":
+            self.btnStartAlarm.configure(text=f"Zatrzymaj alarm\n{music.musicFileNameAlarm}", fg_color="#990000")
             self.btnPlayBell.configure(state="disabled")
             self.btnPlayPrebell.configure(state="disabled")
 
         else: # Nic nie gra
-            self.btnPlayBell.configure(text=f"Odtwórz / zatrzymaj\ndzwonek:\n{self.master.music.musicFileNameBell}", state="normal")
-            self.btnPlayPrebell.configure(text=f"Odtwórz / zatrzymaj\nprzeddzwonek:\n{self.master.music.musicFileNamePrebell}", state="normal")
-            self.btnStartAlarm.configure(text=f"Uruchom alarm:\n{self.master.music.musicFileNameAlarm}", state="normal",fg_color="#e00000")
+            self.btnPlayBell.configure(text=f"Odtwórz / zatrzymaj\ndzwonek:\n{music.musicFileNameBell}{self._duration_text(music._musicFileBell)}", state="normal")
+            self.btnPlayPrebell.configure(text=f"Odtwórz / zatrzymaj\nprzeddzwonek:\n{music.musicFileNamePrebell}{self._duration_text(music._musicFilePrebell)}", state="normal")
+            self.btnStartAlarm.configure(text=f"Uruchom alarm:\n{music.musicFileNameAlarm}", state="normal",fg_color="#e00000")
 
+    def _duration_text(self, file_path):
+        """Zwraca dopisek z długością pliku (z indeksu metadanych) lub pusty napis."""
+        duration = self.master.music.getSoundDuration(file_path)
+        return f" ({duration:.0f}s)" if duration is not None else ""
 
     def _toggle_bell_btn(self):
         """Obsługuje kliknięcie przycisku dzwonka: zatrzymuje lub odtwarza."""
@@ -359,9 +400,9 @@ class SoundSettings(ctk.CTkFrame):
             logger.info("Zatrzymano dzwonek/przeddzwonek.")
         else:
             # Jeśli nic nie gra lub gra alarm (który zostanie przerwany), uruchom dzwonek
-            self.master.music.playBell()
+            self.master.music.playBell(test=True)
             logger.info("Uruchomiono dzwonek.")
-        self._update_button_texts() # Zaktualizuj teksty wszystkich przycisków
+        self.refresh() # Zaktualizuj teksty przycisków (jeśli stan odtwarzania już się zmienił)
 
 
     def _toggle_prebell_btn(self):
@@ -372,9 +413,9 @@ class SoundSettings(ctk.CTkFrame):
             logger.info("Zatrzymano dzwonek/przeddzwonek.")
         else:
             # Jeśli nic nie gra lub gra alarm (który zostanie przerwany), uruchom przeddzwonek
-            self.master.music.playPrebell()
+            self.master.music.playPrebell(test=True)
             logger.info("Uruchomiono przeddzwonek.")
-        self._update_button_texts()
+        self.refresh()
         
 
     def _toggle_alarm_btn(self):
@@ -387,7 +428,7 @@ class SoundSettings(ctk.CTkFrame):
             self.master.music._amp_relay(state=True)
             self.master.music.playAlarm()
             logger.info("Alarm uruchomiony.")
-        self._update_button_texts() # Zawsze aktualizuj teksty po zmianie stanu alarmu
+        self.refresh() # Teksty zmienią się, gdy wątek audio uruchomi lub zatrzyma alarm
 
 
     def _update_weekend_button_text(self):
@@ -399,17 +440,16 @@ class SoundSettings(ctk.CTkFrame):
 
     def _toggle_weekend_btn(self):
         """Obsługuje kliknięcie przycisku trybu weekendowego: przełącza stan."""
-        self.master.schedule.noWeekend = not self.master.schedule.noWeekend 
+        self.master.schedule.setNoWeekend(not self.master.schedule.noWeekend) # Przeplanowuje planistę i zapisuje zmianę
         self._update_weekend_button_text()
-        self.master.schedule.saveScheduleToJson() # Zapisz zmianę stanu weekendu
         logger.info(f"Tryb weekendowy: {'Dzwonki nieaktywne' if self.master.schedule.noWeekend else 'Dzwonki aktywne'}")
 class ScheduleTab(ctk.CTkFrame):
     class BellFrame(ctk.CTkFrame):
-        def __init__(self, master_tab, schedule): # Usunięto on_data_change_callback
+        def __init__(self, master_tab, schedule, on_index_change=None): # Usunięto on_data_change_callback
             super().__init__(master_tab)
             self.master_tab = master_tab
             self.schedule = schedule
-            self.schedule_data = self.schedule.data # Referencja do danych harmonogramu
+            self.on_index_change = on_index_change # Wywoływane, gdy zmiana godziny przesunie dzwonek w posortowanej liście
 
             self.hour_var = ctk.IntVar()
             self.minute_var = ctk.IntVar()
@@ -417,7 +457,7 @@ class ScheduleTab(ctk.CTkFrame):
             self.active_var = ctk.BooleanVar()
 
             self._trace_ids = {}
-            # Callback _on_variable_change będzie tylko aktualizował self.schedule.data
+            # Callback _on_variable_change będzie tylko aktualizował self.schedule.bells
             self._trace_ids['hour'] = self.hour_var.trace_add("write", self._on_variable_change)
             self._trace_ids['minute'] = self.minute_var.trace_add("write", self._on_variable_change)
             self._trace_ids['interval'] = self.interval_var.trace_add("write", self._on_variable_change)
@@ -429,7 +469,7 @@ class ScheduleTab(ctk.CTkFrame):
         def _on_variable_change(self, var_name, index, mode):
             """
             Callback dla zmian zmiennych w BellFrame.
-            Aktualizuje tylko wewnętrzną strukturę danych self.schedule.data.
+            Aktualizuje tylko wewnętrzną strukturę danych self.schedule.bells.
             NIE wywołuje zapisu do pliku ani callbacka do ScheduleTab.
             """
             self._save_current_values_to_schedule_data(suppress_trace_callbacks=True)
@@ -438,10 +478,10 @@ class ScheduleTab(ctk.CTkFrame):
 
         def _save_current_values_to_schedule_data(self, suppress_trace_callbacks=False):
             """
-            Zapisuje aktualne wartości zmiennych z BellFrame do struktury danych harmonogramu (self.schedule.data).
+            Zapisuje aktualne wartości zmiennych z BellFrame do struktury danych harmonogramu (self.schedule.bells).
             `suppress_trace_callbacks` używane, aby uniknąć rekurencyjnego wywoływania trace.
             """
-            if not (0 <= self.current_display_index < len(self.schedule_data["bellSchedule"])):
+            if not (0 <= self.current_display_index < len(self.schedule.bells)):
                 logger.warning(f"Attempted to save data for invalid index: {self.current_display_index}")
                 return
 
@@ -452,13 +492,20 @@ class ScheduleTab(ctk.CTkFrame):
                 if suppress_trace_callbacks:
                     self._remove_all_traces()
 
-                self.schedule_data["bellSchedule"][self.current_display_index] = f"{hour:02d}:{minute:02d}"
-                self.schedule_data["prebellIntervals"][self.current_display_index] = self.interval_var.get()
-                self.schedule_data["bellActive"][self.current_display_index] = self.active_var.get()
+                # Zapis przez scheduleHandling, aby oś czasu zdarzeń została skompilowana ponownie
+                new_index = self.schedule.updateBell(self.current_display_index, hour * 60 + minute,
+                                                     int(round(self.interval_var.get() * 60)), self.active_var.get())
 
                 if suppress_trace_callbacks:
                     self._add_all_traces()
 
+                # Harmonogram pozostaje posortowany - edytowany dzwonek mógł zmienić pozycję
+                if new_index is not None and new_index != self.current_display_index:
+                    self.current_display_index = new_index
+                    self.bell_label.configure(text=f"Dzwonek {self.current_display_index + 1} z {len(self.schedule.bells)}")
+                    if self.on_index_change is not None:
+                        self.on_index_change(new_index)
+
                 logger.debug(f"Saved current BellFrame values to schedule data for index {self.current_display_index}.")
 
             except Exception as e:
@@ -487,8 +534,8 @@ class ScheduleTab(ctk.CTkFrame):
 
         def _load_bell_data(self, index):
             """Ładuje dane dla podanego indeksu i aktualizuje zmienne BellFrame."""
-            if not (0 <= index < len(self.schedule_data["bellSchedule"])):
-                logger.warning(f"Cannot load data for index {index}: out of bounds for bellSchedule of size {len(self.schedule_data['bellSchedule'])}")
+            if not (0 <= index < len(self.schedule.bells)):
+                logger.warning(f"Cannot load data for index {index}: out of bounds for schedule of size {len(self.schedule.bells)}")
                 self._remove_all_traces() # Upewnij się, że nie ma aktywnych trace'ów przed resetowaniem
                 self.hour_var.set(0)
                 self.minute_var.set(0)
@@ -500,24 +547,18 @@ class ScheduleTab(ctk.CTkFrame):
                 return False
 
             self.current_display_index = index
-            time_str = self.schedule_data["bellSchedule"][index]
+            bell = self.schedule.bells[index]
             
             self._remove_all_traces() # Usuń wszystkie śledzenia przed ustawieniem wartości
 
-            try:
-                self.hour_var.set(int(time_str.split(":")[0]))
-                self.minute_var.set(int(time_str.split(":")[1]))
-            except ValueError:
-                logger.error(f"Błąd parsowania czasu dla dzwonka {index}: {time_str}. Ustawiam na 00:00.")
-                self.hour_var.set(0)
-                self.minute_var.set(0)
-
-            self.interval_var.set(self.schedule_data["prebellIntervals"][index])
-            self.active_var.set(self.schedule_data["bellActive"][index])
+            self.hour_var.set(bell.hour)
+            self.minute_var.set(bell.minuteOfHour)
+            self.interval_var.set(bell.prebellInterval)
+            self.active_var.set(bell.active)
 
             self._add_all_traces() # Dodaj z powrotem wszystkie śledzenia
 
-            self.bell_label.configure(text=f"Dzwonek {self.current_display_index + 1} z {len(self.schedule_data['bellSchedule'])}")
+            self.bell_label.configure(text=f"Dzwonek {self.current_display_index + 1} z {len(self.schedule.bells)}")
             logger.info(f"Loaded bell data for index: {index}")
             return True
 
@@ -535,14 +576,14 @@ class ScheduleTab(ctk.CTkFrame):
             self.label_frame.grid(row=0, column=0, columnspan=3, rowspan=1, sticky="ew", pady=(5, 1))
             self.label_frame.grid_columnconfigure(0, weight=1)
             self.bell_label = ctk.CTkLabel(self.label_frame, text="Dzwonek X z Y",
-                                             font=ctk.CTkFont(family="Calibri", size=24, weight="bold"))
+                                             font=get_font(size=24, weight="bold"))
             self.bell_label.grid(pady=(5, 5))
 
             ctk.CTkCheckBox(
                 self,
                 text="Aktywny",
                 variable=self.active_var,
-                font=ctk.CTkFont(family="Calibri", size=22, weight="bold"),
+                font=get_font(size=22, weight="bold"),
                 checkbox_width=50, 
                 checkbox_height=50
             ).grid(row=1, column=0, rowspan=2)
@@ -553,7 +594,7 @@ class ScheduleTab(ctk.CTkFrame):
                 variable=self.hour_var,
                 min_value=0, max_value=23, step_size=1,
                 width=180, height=60,
-                font=ctk.CTkFont(family="Calibri", size=22, weight="bold")
+                font=get_font(size=22, weight="bold")
             ).grid(row=2, column=1, sticky="n")
 
             MyLabel(self, text="Minuta:").grid(row=1, column=2, sticky="s", pady=5)
@@ -562,7 +603,7 @@ class ScheduleTab(ctk.CTkFrame):
                 variable=self.minute_var,
                 min_value=0, max_value=59, step_size=1,
                 width=180, height=60,
-                font=ctk.CTkFont(family="Calibri", size=22, weight="bold")
+                font=get_font(size=22, weight="bold")
             ).grid(row=2, column=2, sticky="n")
 
             radio_buttons_frame = ctk.CTkFrame(self)
@@ -577,7 +618,7 @@ class ScheduleTab(ctk.CTkFrame):
                     text=str(interval) + " min" if interval != 0 else "Brak",
                     variable=self.interval_var,
                     value=interval,
-                    font=ctk.CTkFont(family="Calibri", size=18, weight="bold"),
+                    font=get_font(size=18, weight="bold"),
                     width=60, height=25,
                     radiobutton_height=40,
                     radiobutton_width=40
@@ -625,14 +666,14 @@ class ScheduleTab(ctk.CTkFrame):
         ScheduleButton(self.nav_frame, text="Poprzedni", command=self._show_prev_bell).grid(row=0, column=0, padx=5, pady=5, sticky="w")
         ScheduleButton(self.nav_frame, text="Następny", command=self._show_next_bell).grid(row=0, column=1, padx=5, pady=5, sticky="e")
 
-        if not self.schedule.data["bellSchedule"]:
+        if not self.schedule.bells:
             self.schedule.addSchedule()
 
         # Tworzenie pojedynczej instancji BellFrame (bez on_data_change_callback)
-        self.current_bell_frame = self.BellFrame(self.container, self.schedule)
+        self.current_bell_frame = self.BellFrame(self.container, self.schedule, on_index_change=self._on_bell_moved)
         self.current_bell_frame.place(in_=self.container, relx=0, rely=0, relwidth=1, relheight=1)
 
-        if self.schedule.data["bellSchedule"]:
+        if self.schedule.bells:
             self._display_bell_at_index(0)
         else:
             self.show_message("Brak dzwonków do wyświetlenia, dodaj nowy.", "red")
@@ -642,57 +683,61 @@ class ScheduleTab(ctk.CTkFrame):
         Zmienia wyświetlany dzwonek w pojedynczej BellFrame.
         Ładuje dane dla nowego indeksu do istniejącej BellFrame.
         """
-        if not self.schedule.data["bellSchedule"]:
+        if not self.schedule.bells:
             logger.warning("No bells in schedule to display.")
             return
 
-        if 0 <= index < len(self.schedule.data["bellSchedule"]):
+        if 0 <= index < len(self.schedule.bells):
             self.current_index = index
             self.current_bell_frame._load_bell_data(self.current_index)
             logger.info(f"Displayed bell at index: {index}")
         else:
             logger.warning(f"Attempted to display bell at invalid index: {index}")
             self.current_index = 0
-            if self.schedule.data["bellSchedule"]:
+            if self.schedule.bells:
                 self.current_bell_frame._load_bell_data(self.current_index)
             else:
                 self.show_message("Brak dzwonków do wyświetlenia. Dodaj pierwszy.", "orange")
 
 
+    def _on_bell_moved(self, new_index):
+        """Aktualizuje bieżący indeks po przesunięciu edytowanego dzwonka w posortowanym harmonogramie."""
+        self.current_index = new_index
+
     def _add_bell(self):
         """Dodaje nowy dzwonek do harmonogramu i wyświetla go."""
-        if self.schedule.addSchedule(): 
-            new_index = len(self.schedule.data["bellSchedule"]) - 1
+        new_index = self.schedule.addSchedule()
+        if new_index is not None:
             self._display_bell_at_index(new_index) 
             #self._save_current_bell_to_file_async() # Zapisz zmiany do pliku po dodaniu
-            self.master.frames["main"].update_display(self.schedule.nextOccurrence, self.schedule.getFormattedScheduleList())
+            self.master.refresh_main_screen()
             self.show_message(f"Dzwonek {new_index + 1} dodany pomyślnie!", "green")
             logger.info("Added new bell.")
         else:
-            self.show_message("Nie można dodać \n więcej dzwonków!", "red")
+            self.show_message(f"Nie można dodać więcej \n dzwonków (limit {self.schedule.maxBells})!", "red")
             logger.warning("Attempted to add bell, but reached maximum.")
 
 
     def _delete_bell(self):
         """Usuwa bieżący dzwonek i aktualizuje wyświetlanie."""
-        if not self.schedule.data["bellSchedule"]:
+        if not self.schedule.bells:
             self.show_message("Brak dzwonków do usunięcia!", "orange")
             logger.warning("No bells to delete.")
             return
 
         deleted_index = self.current_index
         if self.schedule.deleteSchedule(deleted_index):
-            if len(self.schedule.data["bellSchedule"]) == 0:
+            if len(self.schedule.bells) == 0:
                 self.schedule.addSchedule()
                 self._display_bell_at_index(0)
                 self.show_message("Wszystkie dzwonki usunięte. Dodano nowy domyślny.", "red")
             else:
-                self.current_index = min(deleted_index, len(self.schedule.data["bellSchedule"]) - 1)
+                self.current_index = min(deleted_index, len(self.schedule.bells) - 1)
                 self._display_bell_at_index(self.current_index)
                 self.show_message(f"Dzwonek {deleted_index + 1} usunięty!", "orange")
 
             #self._save_current_bell_to_file_async() # Zapisz zmiany do pliku po usunięciu
-            self.master.frames["main"].update_display(self.schedule.nextOccurrence, self.schedule.getFormattedScheduleList())
+            self.master.refresh_main_screen()
             logger.info(f"Deleted bell at index: {deleted_index}.")
         else:
             self.show_message(f"Nie udało się usunąć dzwonka {deleted_index + 1}. Musi być co najmniej 1 dzwonek.", "red")
@@ -700,50 +745,49 @@ class ScheduleTab(ctk.CTkFrame):
 
     def _save_current_bell_to_file(self):
         """
-        Zapisuje zmiany w aktualnie widocznej ramce dzwonka (które już są w self.schedule.data)
+        Zapisuje zmiany w aktualnie widocznej ramce dzwonka (które już są w self.schedule.bells)
         do pliku JSON. Wywoływane przez przycisk "Zapisz zmiany".
         """
         self._save_current_bell_to_file_async()
 
     def _save_current_bell_to_file_async(self):
-        """Uruchamia zapis zmian w osobnym wątku."""
-        def save_in_thread():
-            try:
-                self.schedule.saveScheduleToJson() # To jest faktyczny zapis do pliku
+        """Zleca zapis zmian wątkowi zapisującemu harmonogram; komunikat pojawia się po zapisie."""
+        def on_saved(error):
+            if error is None:
                 logger.info("Schedule saved to JSON.")
                 self.after(0, lambda: self.show_message("Zmiany zapisane!", "green"))
-            except Exception as e:
-                logger.error(f"Error saving schedule to file: {e}")
-                self.after(0, lambda: self.show_message(f"Błąd zapisu: {e}", "red"))
-        threading.Thread(target=save_in_thread, daemon=True).start()
+            else:
+                logger.error(f"Error saving schedule to file: {error}")
+                self.after(0, lambda: self.show_message(f"Błąd zapisu: {error}", "red"))
+        self.schedule.saveScheduleToJson(callback=on_saved)
 
     def _show_next_bell(self):
         """Przechodzi do następnego dzwonka. Zachowuje zmiany przed przejściem."""
-        if not self.schedule.data["bellSchedule"]:
+        if not self.schedule.bells:
             self.show_message("Brak dzwonków do nawigacji.", "orange")
             return
         
         # Opcjonalnie: Zapisz bieżące zmiany przed przejściem do następnego dzwonka
         # self._save_current_bell_to_file_async(show_message=False) 
 
-        next_index = (self.current_index + 1) % len(self.schedule.data["bellSchedule"])
+        next_index = (self.current_index + 1) % len(self.schedule.bells)
         self._display_bell_at_index(next_index)
 
     def _show_prev_bell(self):
         """Przechodzi do poprzedniego dzwonka. Zachowuje zmiany przed przejściem."""
-        if not self.schedule.data["bellSchedule"]:
+        if not self.schedule.bells:
             self.show_message("Brak dzwonków do nawigacji.", "orange")
             return
         
         # Opcjonalnie: Zapisz bieżące zmiany przed przejściem do poprzedniego dzwonka
         # self._save_current_bell_to_file_async(show_message=False)
 
-        prev_index = (self.current_index - 1 + len(self.schedule.data["bellSchedule"])) % len(self.schedule.data["bellSchedule"])
+        prev_index = (self.current_index - 1 + len(self.schedule.bells)) % len(self.schedule.bells)
         self._display_bell_at_index(prev_index)
 
     def show_message(self, message, color="white"):
         """Wyświetla komunikat."""
-        NotificationPopup(self.master, message, color=color)
+        self.master.notify(message, color=color)
 
 
 
@@ -773,8 +817,9 @@ class ClockTab(ctk.CTkFrame):
         entry_frame = ctk.CTkFrame(self.center_frame)
         entry_frame.pack(fill="x")
 
-        self.hour_entry_var = ctk.IntVar(value=datetime.now().hour)
-        self.minute_entry_var = ctk.IntVar(value=datetime.now().minute)
+        now = self.master.clock.now()
+        self.hour_entry_var = ctk.IntVar(value=now.hour)
+        self.minute_entry_var = ctk.IntVar(value=now.minute)
 
         self.hour_entry = MySpinbox(entry_frame, min_value=0, max_value=23, width=180, height=60, 
                                      variable=self.hour_entry_var)
@@ -792,7 +837,7 @@ class ClockTab(ctk.CTkFrame):
 
     def update_time(self):
         """Aktualizuje wyświetlany czas na etykiecie zegara."""
-        self.time_label.configure(text=datetime.now().strftime("%H:%M:%S"))
+        self.time_label.configure(text=self.master.clock.now().strftime("%H:%M:%S"))
 
     def _save_clock_time(self):
         """
@@ -803,6 +848,7 @@ class ClockTab(ctk.CTkFrame):
         minute = self.minute_entry_var.get()
         
         if clockHandling.set_system_time(hour=hour, minute=minute):
+            self.master.scheduler.reschedule() # Termin najbliższego zdarzenia zmienił się razem z zegarem
             #self.message_label.configure(text="Czas zapisany pomyślnie!", text_color="green")
             logger.info(f"Czas systemowy ustawiono na {hour:02d}:{minute:02d}.")
         else:
@@ -821,8 +867,8 @@ class ScreensaverFrame(ctk.CTkFrame):
         # Etykieta dużego zegara
         self.clock_label = ctk.CTkLabel(
             self, 
-            text=datetime.now().strftime("%H:%M:%S"), 
-            font=ctk.CTkFont("Helvetica", 150), 
+            text=master.clock.now().strftime("%H:%M:%S"), 
+            font=get_font("Helvetica", 150), 
             text_color="white"
         )
         self.clock_label.place(relx=0.5, rely=0.5, anchor="center") # Wyśrodkowanie zegara
@@ -838,16 +884,17 @@ class ScreensaverFrame(ctk.CTkFrame):
 
         # Pierwsza aktualizacja przy inicjalizacji
         # update_clock będzie wywoływane co sekundę przez BellApp._update_main_loop
-        self.update_clock(master.schedule.nextOccurrence) 
+        self.update_clock(master.scheduler.snapshot().nextOccurrence) 
 
     def update_clock(self, next_occurrence):
         """
         Aktualizuje wyświetlanie zegara i następnego dzwonka na wygaszaczu ekranu.
         Wywoływane co sekundę przez główną pętlę aplikacji.
         """
-        now = datetime.now().strftime("%H:%M:%S")
+        now = self.master.clock.now().strftime("%H:%M:%S")
         self.clock_label.configure(text=now)
-        self.next_bell_label.configure(text= next_occurrence)
+        if self.next_bell_label.cget("text") != next_occurrence:
+            self.next_bell_label.configure(text= next_occurrence)
         
 class PopupFrame(ctk.CTkFrame):
     """
@@ -859,8 +906,8 @@ class PopupFrame(ctk.CTkFrame):
         # Etykieta dużego zegara
         self.clock_label = ctk.CTkLabel(
             self, 
-            text=datetime.now().strftime("%H:%M:%S"), 
-            font=ctk.CTkFont("Helvetica", 150), 
+            text=master.clock.now().strftime("%H:%M:%S"), 
+            font=get_font("Helvetica", 150), 
             text_color="white"
         )
 
@@ -937,8 +984,7 @@ class LoginScreen(ctk.CTkFrame):
             self._clear_entry()
         else:
             self.entry.configure(border_color="red")
-            # Używamy NotificationPopup bezpośrednio, bo frames["popup"] może nie być zainicjowane
-            NotificationPopup(self.master, "Błędny PIN!", color="red") 
+            self.master.notify("Błędny PIN!", color="red")
             self.pin_var.set("")
 
 
@@ -1044,21 +1090,21 @@ class SecurityTab(ctk.CTkFrame):
         p2 = self.confirm_pin_var.get()
 
         if not p1 or not p2:
-             NotificationPopup(self.master, "Pola nie mogą być puste", color="orange")
+             self.master.notify("Pola nie mogą być puste", color="orange")
              return
 
         if len(p1) < 4:
-             NotificationPopup(self.master, "Podany PIN jest za krótki - minimum 4 cyfry)", color="orange")
+             self.master.notify("Podany PIN jest za krótki - minimum 4 cyfry)", color="orange")
              return
 
         if p1 == p2:
             if self.auth.set_user_pin(p1):
-                NotificationPopup(self.master, "Hasło zmienione!", color="green")
+                self.master.notify("Hasło zmienione!", color="green")
                 self.new_pin_var.set("")
                 self.confirm_pin_var.set("")
                 # Reset focusu na pierwsze pole
                 self._set_active_field(self.new_pin_var, self.entry_new)
             else:
-                NotificationPopup(self.master, "Błąd zapisu.", color="red")
+                self.master.notify("Błąd zapisu.", color="red")
         else:
-            NotificationPopup(self.master, "Hasła nie są identyczne", color="red")
\ No newline at end of file
+            self.master.notify("Hasła nie są identyczne", color="red")
\ No newline at end of file
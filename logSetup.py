@@ -0,0 +1,169 @@
+import atexit
+import os
+import queue
+import sys
+import threading
+import time
+import logging
+from logging.handlers import QueueHandler, RotatingFileHandler
+
+from constants import LOG_QUEUE_MAX_RECORDS, LOG_DEBUG_DROP_THRESHOLD, LOG_BATCH_MAX_RECORDS, LOG_BATCH_INTERVAL_SECONDS
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Handler wrzucający komunikaty do kolejki bez blokowania wątku, który loguje
+    (planista, wątek audio, GUI). Gdy kolejka rośnie, komunikaty są odrzucane:
+    DEBUG powyżej `debug_threshold` oczekujących, INFO powyżej `max_records`.
+    Ostrzeżenia i błędy nie są nigdy odrzucane.
+    """
+    def __init__(self, log_queue, max_records=LOG_QUEUE_MAX_RECORDS, debug_threshold=LOG_DEBUG_DROP_THRESHOLD):
+        super().__init__(log_queue)
+        self.maxRecords = max_records
+        self.debugThreshold = debug_threshold
+        self.dropped = 0  # Liczba odrzuconych komunikatów (odczytywana przez BatchingLogListener)
+
+    def enqueue(self, record):
+        if record.levelno < logging.WARNING:
+            pending = self.queue.qsize()
+            limit = self.debugThreshold if record.levelno <= logging.DEBUG else self.maxRecords
+            if pending >= limit:
+                self.dropped += 1
+                return
+        self.queue.put_nowait(record)
+
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler, który nie opróżnia bufora po każdym komunikacie -
+    zapis na kartę SD odbywa się raz na paczkę komunikatów (flushBatch).
+    """
+    def flush(self):
+        pass
+
+    def flushBatch(self):
+        super().flush()
+
+
+class BatchingLogListener:
+    """
+    Wątek odbierający komunikaty z kolejki i przekazujący je do właściwych handlerów
+    (plik, konsola) w paczkach: do `batch_size` komunikatów lub `batch_interval` sekund,
+    po których handlery są opróżniane jednorazowo.
+    """
+    def __init__(self, log_queue, handlers, queue_handler=None, batch_size=LOG_BATCH_MAX_RECORDS,
+                 batch_interval=LOG_BATCH_INTERVAL_SECONDS):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.queueHandler = queue_handler
+        self.batchSize = batch_size
+        self.batchInterval = batch_interval
+        self._reportedDropped = 0
+        self._stop = object()  # Znacznik końca pracy wrzucany do kolejki
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """Zapisuje wszystkie oczekujące komunikaty i kończy wątek."""
+        if self._thread is None:
+            return
+        self.queue.put(self._stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            record = self.queue.get()
+            batch = [record]
+            deadline = time.monotonic() + self.batchInterval
+            while record is not self._stop and len(batch) < self.batchSize:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    record = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(record)
+
+            self._write(batch)
+            if batch[-1] is self._stop:
+                return
+
+    def _write(self, batch):
+        records = [record for record in batch if record is not self._stop]
+        dropped = self.queueHandler.dropped if self.queueHandler is not None else 0
+        if dropped != self._reportedDropped:
+            records.append(logging.makeLogRecord({
+                "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                "msg": f"Pominięto {dropped - self._reportedDropped} komunikatów dziennika (kolejka przepełniona)",
+            }))
+            self._reportedDropped = dropped
+        for record in records:
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    try:
+                        handler.handle(record)
+                    except Exception:
+                        handler.handleError(record)
+        for handler in self.handlers:
+            try:
+                if isinstance(handler, BatchedRotatingFileHandler):
+                    handler.flushBatch()
+                else:
+                    handler.flush()
+            except Exception as e:
+                print(f"Błąd zapisu dziennika: {e}", file=sys.stderr)
+
+
+_listener = None
+
+
+def setupLogging(log_dir, level=logging.INFO):
+    """
+    Konfiguruje logowanie aplikacji: wszystkie moduły logują przez kolejkę,
+    a zapis do pliku (z rotacją) i na konsolę wykonuje osobny wątek (BatchingLogListener).
+    Zwraca listener; przy zakończeniu programu oczekujące komunikaty są zapisywane automatycznie.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+    log_file = os.path.join(log_dir, "bell.log")
+
+    file_handler = BatchedRotatingFileHandler(log_file, maxBytes=1048576, backupCount=5, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.Queue()
+    queue_handler = DroppingQueueHandler(log_queue)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    _listener = BatchingLogListener(log_queue, [file_handler, console_handler], queue_handler)
+    _listener.start()
+    atexit.register(shutdownLogging)
+    return _listener
+
+
+def shutdownLogging():
+    """Zapisuje oczekujące komunikaty i zatrzymuje wątek dziennika (wywoływane też przy wyjściu z programu)."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
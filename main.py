@@ -1,36 +1,24 @@
+import time
+BOOT_START = time.monotonic() # Początek uruchamiania - przed importem pozostałych modułów
 import platform
 import os
+import sys
+import json
+import signal
+import argparse
+import threading
 from schedule import scheduleHandling
-from music import musicHandling
-from gui import BellApp
-from logging.handlers import RotatingFileHandler
-from auth import AuthHandler
-from constants import AMP_OUTPUT_PIN_GPIO, USB_PATH_LINUX, USB_PATH_WINDOWS, SCREEN_SAVER_TIME_SECONDS, LOGS_PATH_LINUX
+from scheduler import BellScheduler
+from constants import AMP_OUTPUT_PIN_GPIO, USB_PATH_LINUX, USB_PATH_WINDOWS, SCREEN_SAVER_TIME_SECONDS, LOGS_PATH_LINUX, CONTROL_SOCKET_PATH
 import logging
 
+from logSetup import setupLogging
+from bootTiming import BootTimer
 
-log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), LOGS_PATH_LINUX)
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
 
-log_file = os.path.join(log_dir, "bell.log")
+# Konfiguracja logowania - zapis do pliku i na konsolę w osobnym wątku (patrz logSetup)
+setupLogging(os.path.join(os.path.dirname(os.path.abspath(__file__)), LOGS_PATH_LINUX))
 
-file_handler = RotatingFileHandler(log_file, maxBytes=1048576, backupCount=5, encoding='utf-8')
-file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-
-logging.basicConfig(
-    level=logging.INFO, 
-    handlers=[file_handler, console_handler]
-)
-
-# Konfiguracja logowania
-#logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-# Ustawienie zmiennej DISPLAY (może wymagać dostosowania do środowiska)
-os.environ['DISPLAY'] = ':0'
 
 def quit_plymouth():
     os.system("sudo plymouth quit")
@@ -44,14 +32,86 @@ def get_base_path():
         return USB_PATH_LINUX
     
 
-if __name__ == "__main__":
-    base_path = get_base_path()
+def run_gui(base_path):
+    """Uruchamia aplikację z interfejsem graficznym (kiosk)."""
+    # Ustawienie zmiennej DISPLAY (może wymagać dostosowania do środowiska)
+    os.environ['DISPLAY'] = ':0'
+    boot = BootTimer(BOOT_START)
+    from music import musicHandling
 
     schedule = scheduleHandling()
+    boot.mark("schedule_loaded")
     music = musicHandling(base_path, AMP_OUTPUT_PIN_GPIO)
+    boot.mark("audio_ready")
+    scheduler = BellScheduler(schedule, music, on_first_tick=lambda: boot.mark("first_scheduler_tick"))
+    scheduler.start() # Dzwonki obsługuje osobny wątek, niezależny od pętli GUI
+    schedule.startWatching() # Zmiany pliku harmonogramu wczytywane bez restartu
+
+    # Import GUI dopiero tutaj - planista działa, zanim załaduje się Tk i customtkinter,
+    # a tryb bez GUI nie ładuje ich wcale
+    from gui import BellApp
+    from auth import AuthHandler
+    boot.mark("gui_imported")
     auth = AuthHandler()
-    appGui = BellApp(music=music, schedule=schedule, screensaver_time=SCREEN_SAVER_TIME_SECONDS, auth_handler=auth)
+    appGui = BellApp(music=music, schedule=schedule, screensaver_time=SCREEN_SAVER_TIME_SECONDS, auth_handler=auth,
+                     scheduler=scheduler, boot=boot)
 
     appGui.mainloop()
     appGui.after(2000, quit_plymouth)
-    
\ No newline at end of file
+
+
+def run_headless(base_path, socket_path):
+    """
+    Uruchamia tylko harmonogram i odtwarzanie dźwięków (bez Tk/customtkinter).
+    Sterowanie odbywa się przez gniazdo Unix (patrz control.ControlServer).
+    """
+    boot = BootTimer(BOOT_START)
+    from music import musicHandling
+    from control import ControlServer
+
+    schedule = scheduleHandling()
+    boot.mark("schedule_loaded")
+    music = musicHandling(base_path, AMP_OUTPUT_PIN_GPIO)
+    boot.mark("audio_ready")
+    scheduler = BellScheduler(schedule, music, on_first_tick=lambda: boot.mark("first_scheduler_tick"))
+    scheduler.start()
+    schedule.startWatching()
+    control = ControlServer(socket_path, schedule, music, scheduler)
+    control.start()
+    boot.mark("control_ready")
+    logging.info("Uruchomiono w trybie bez GUI.")
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    while not stop_event.wait(1):
+        pass
+
+    control.stop()
+    schedule.stopWatching()
+    scheduler.stop()
+    schedule.saveScheduleToJson(wait=True)
+    music.stopMusic(wait=True)
+    logging.info("Aplikacja zamykana.")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Dzwonek szkolny")
+    parser.add_argument("--headless", action="store_true", help="uruchom bez GUI (tylko harmonogram i dźwięk)")
+    parser.add_argument("--socket", default=CONTROL_SOCKET_PATH, help="ścieżka gniazda sterującego trybu bez GUI")
+    parser.add_argument("--ctl", metavar="KOMENDA", help="wyślij komendę do działającej instancji (np. status, bell, stop)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.ctl:
+        from control import send_command
+        print(json.dumps(send_command(args.socket, args.ctl), ensure_ascii=False, indent=2))
+        sys.exit(0)
+
+    base_path = get_base_path()
+    if args.headless:
+        run_headless(base_path, args.socket)
+    else:
+        run_gui(base_path)
@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+import logging
+
+from constants import METADATA_INDEX_PATH_LINUX
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Maksymalna liczba plików pamiętanych w indeksie (najdawniej używane są usuwane)
+_MAX_ENTRIES = 256
+
+
+class Mp3MetadataIndex:
+    """
+    Trwały indeks metadanych plików MP3 (długość, częstotliwość próbkowania, kanały, bitrate).
+    Wpis jest ważny dopóki nie zmieni się rozmiar ani czas modyfikacji pliku - tylko wtedy
+    plik jest ponownie parsowany przez mutagen. Indeks jest zapisywany w pliku JSON,
+    więc przetrwa restart aplikacji.
+    """
+    def __init__(self, index_path=None):
+        self.index_path = index_path or os.path.join(os.path.dirname(os.path.abspath(__file__)), METADATA_INDEX_PATH_LINUX)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r") as f:
+                self._entries = json.load(f)
+            logger.info(f"Załadowano indeks metadanych MP3: {len(self._entries)} plików.")
+        except (IOError, ValueError) as e:
+            logger.error(f"Błąd odczytu indeksu metadanych MP3 {self.index_path}: {e}")
+            self._entries = {}
+
+    def _save(self):
+        """Zapisuje indeks (plik tymczasowy + zamiana, aby nie zostawić uciętego pliku)."""
+        tmp_path = self.index_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.index_path)
+        except IOError as e:
+            logger.error(f"Błąd zapisu indeksu metadanych MP3 {self.index_path}: {e}")
+
+    def get(self, file_path):
+        """
+        Zwraca metadane pliku (słownik) lub None, jeśli pliku nie ma lub nie da się go odczytać.
+        Plik jest parsowany tylko, gdy nie ma go w indeksie albo zmienił się jego rozmiar/mtime.
+        """
+        if not file_path:
+            return None
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                return entry
+
+        try:
+            from mutagen import mp3 # Import przy pierwszym parsowaniu - nie spowalnia startu aplikacji
+            info = mp3.Open(file_path).info
+        except Exception as e:
+            logger.error(f"Błąd odczytu metadanych pliku MP3 {file_path}: {e}")
+            return None
+
+        entry = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "duration": info.length,
+            "sample_rate": info.sample_rate,
+            "channels": info.channels,
+            "bitrate": info.bitrate,
+        }
+        with self._lock:
+            self._entries.pop(file_path, None)
+            self._entries[file_path] = entry
+            while len(self._entries) > _MAX_ENTRIES:
+                del self._entries[next(iter(self._entries))]
+            self._save()
+        logger.info(f"Zindeksowano plik MP3: {os.path.basename(file_path)} ({info.length:.1f}s, {info.sample_rate} Hz, {info.bitrate // 1000} kbps)")
+        return entry
+
+    def peek(self, file_path):
+        """Zwraca metadane z indeksu bez sprawdzania pliku na dysku (do częstego odczytu np. w GUI)."""
+        return self._entries.get(file_path)
+
+    def refresh(self, file_paths):
+        """Aktualizuje indeks dla podanych plików (parsuje tylko zmienione)."""
+        for file_path in file_paths:
+            self.get(file_path)
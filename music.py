@@ -2,26 +2,34 @@ import pygame
 import os
 import time
 import threading
-from mutagen import mp3
-import platform
+import queue
 import logging
 
 from constants import MAX_MUSIC_LEN
-if platform.system() == "Windows":
-    from fake_rpi.RPi import GPIO
-else:
-    import RPi.GPIO as GPIO
-    
+from soundCache import SoundCache
+from soundIndex import SoundFileIndexer, SoundFiles
+from mediaIndex import Mp3MetadataIndex
+from relay import RelayDriver
+from clockHandling import systemClock
+from viewModel import Observable
+
 # Konfiguracja logowania dla modułu music
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Priorytety komend wątku audio (mniejsza liczba = ważniejsza komenda)
+PRIORITY_STOP = 0
+PRIORITY_ALARM = 1
+PRIORITY_BELL = 2
+PRIORITY_PREBELL = 3
+PRIORITY_TEST = 4
+
 class musicHandling: 
     """
     Klasa odpowiedzialna za odtwarzanie dźwięków dzwonków, przeddzwonków i alarmów,
     oraz sterowanie przekaźnikiem wzmacniacza.
     """
-    def __init__(self, filesPath, AMP_OUTPUT_PIN):
+    def __init__(self, filesPath, AMP_OUTPUT_PIN, relay=None, clock=None):
         try:
             # Próba normalnego uruchomienia dźwięku
             # frequency=44100 (Jakość CD), size=-16 (16-bit), channels=2 (Stereo), buffer=4096 (Zapobiega trzaskom)
@@ -33,164 +41,245 @@ class musicHandling:
             logger.warning("Brak urządzenia audio! Uruchamianie w trybie 'dummy' (bez dźwięku).")
             os.environ["SDL_AUDIODRIVER"] = "dummy"
             pygame.mixer.init()
+        # Kanał zarezerwowany dla dzwonków odtwarzanych z pamięci podręcznej
+        pygame.mixer.set_reserved(1)
+        self._channel = pygame.mixer.Channel(0)
+        self._channel.set_volume(0.8)
+        self._soundCache = SoundCache()
+        self._mp3Index = Mp3MetadataIndex()
         self.AMP_OUTPUT_PIN = AMP_OUTPUT_PIN
+        self.clock = clock if clock is not None else systemClock
+        # Pin konfigurowany raz; zapisy bez zmiany stanu są pomijane
+        self.relay = relay if relay is not None else RelayDriver(AMP_OUTPUT_PIN)
         self.soundFilesPath = filesPath
         self._sampleSoundLocation = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Files/DomyslnyDzwiek.mp3")
         
-        self._play_lock = threading.Lock() 
         self._is_alarm_playing = False 
         self._is_bell_playing = False
         self._is_prebell_playing = False
-        threading.Thread(target=self._update_audio_loop, daemon=True).start()
+        self.playingRole = Observable(None)  # Rola aktualnie granego dźwięku ("bell", "prebell", "alarm" lub None) - dla GUI
 
-    def _update_audio_loop(self):
-        """
-        Pętla do aktualizacji plików dźwiękowych
-        """
-        while True:
-            self._musicFileBell = self._find_mp3_file("1")
-            self._musicFilePrebell = self._find_mp3_file("2")
-            self._musicFileAlarm = self._find_mp3_file("0")
+        # Jeden długo żyjący wątek audio, zasilany kolejką priorytetową komend
+        self._commands = queue.PriorityQueue()
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        self._last_stop_seq = 0
+        threading.Thread(target=self._audio_worker, name="AudioWorker", daemon=True).start()
 
-            # Upewnij się, że nazwy plików są poprawne, nawet jeśli plik nie został znaleziony
-            self.musicFileNameBell = os.path.basename(self._musicFileBell) if self._musicFileBell else "Brak pliku"
-            self.musicFileNamePrebell = os.path.basename(self._musicFilePrebell) if self._musicFilePrebell else "Brak pliku"
-            self.musicFileNameAlarm = os.path.basename(self._musicFileAlarm) if self._musicFileAlarm else "Brak pliku"
-            time.sleep(5)
+        # Pliki dźwiękowe są wyszukiwane raz (w tle) i ponownie tylko po zmianie na nośniku
+        self.soundFiles = Observable(SoundFiles(None, None, None))  # Wynik indeksowania plików - dla GUI
+        self._soundIndexer = SoundFileIndexer(self.soundFilesPath, self._sampleSoundLocation, self._on_sound_files_changed)
+        self._soundIndexer.start()
 
-    def _find_mp3_file(self, start_letter):
+    def _on_sound_files_changed(self, files):
         """
-        Szuka pliku MP3 zaczynającego się na daną literę w katalogu soundFilesPath.
-        Zwraca pełną ścieżkę do pliku lub domyślny plik/None jeśli nie znaleziono.
+        Odbiera nowy wynik indeksowania plików dźwiękowych (wywoływane po zmianie na nośniku).
         """
-        for root, dirs, files in os.walk(self.soundFilesPath):
-            for filename in files:
-                if filename.lower().endswith(".mp3") and filename.startswith(start_letter):
-                    file_path = os.path.join(root, filename)
-                    if os.path.exists(file_path):
-                        logger.info(f"Znaleziono plik dla '{start_letter}': {file_path}")
-                        return file_path
-        #logger.warning(f"Nie znaleziono pliku MP3 zaczynającego się na '{start_letter}' w lokalizacji {self.soundFilesPath}. Użycie domyślnego: {self._sampleSoundLocation}")
-        if os.path.exists(self._sampleSoundLocation):
-            return self._sampleSoundLocation
-        else:
-            logger.error(f"Domyślny plik dźwiękowy nie istnieje: {self._sampleSoundLocation}")
-            return None # Zwróć None, jeśli nawet domyślny plik jest niedostępny
+        # Metadane są parsowane tylko dla nowych lub zmienionych plików
+        self._mp3Index.refresh([files.bell, files.prebell, files.alarm])
+        # Publikowane po odświeżeniu metadanych - GUI od razu pokaże długości plików
+        self.soundFiles.set(files)
+        # Dekodowanie z wyprzedzeniem - pliki bez zmian (ścieżka, mtime, rozmiar) nie są dekodowane ponownie.
+        # Dzwonek i przeddzwonek grają najwyżej MAX_MUSIC_LEN sekund - buforowany jest tylko ten początek
+        self._soundCache.preload([(files.bell, MAX_MUSIC_LEN), (files.prebell, MAX_MUSIC_LEN), (files.alarm, None)])
+
+    @property
+    def _musicFileBell(self):
+        return self.soundFiles.value.bell
+
+    @property
+    def _musicFilePrebell(self):
+        return self.soundFiles.value.prebell
+
+    @property
+    def _musicFileAlarm(self):
+        return self.soundFiles.value.alarm
+
+    # Upewnij się, że nazwy plików są poprawne, nawet jeśli plik nie został znaleziony
+    @property
+    def musicFileNameBell(self):
+        return os.path.basename(self._musicFileBell) if self._musicFileBell else "Brak pliku"
+
+    @property
+    def musicFileNamePrebell(self):
+        return os.path.basename(self._musicFilePrebell) if self._musicFilePrebell else "Brak pliku"
 
+    @property
+    def musicFileNameAlarm(self):
+        return os.path.basename(self._musicFileAlarm) if self._musicFileAlarm else "Brak pliku"
 
     def _get_mp3_length(self, file_path):
-        """Zwraca długość pliku MP3 w sekundach."""
-        if not file_path or not os.path.exists(file_path):
-            return MAX_MUSIC_LEN
-        try:
-            audio = mp3.Open(file_path)
-            return audio.info.length
-        except Exception as e:
-            logger.error(f"Błąd odczytu długości pliku MP3 {file_path}: {e}")
+        """Zwraca długość pliku MP3 w sekundach (z indeksu metadanych)."""
+        entry = self._mp3Index.get(file_path)
+        if entry is None:
             return MAX_MUSIC_LEN
+        return entry["duration"]
 
-    def _amp_relay(self, state: bool):
+    def getSoundDuration(self, file_path):
+        """Zwraca długość pliku w sekundach z indeksu metadanych (bez dostępu do dysku) lub None."""
+        entry = self._mp3Index.peek(file_path)
+        return entry["duration"] if entry else None
+
+    def _amp_relay(self, state: bool, trace=None):
         """
-        Steruje przekaźnikiem wzmacniacza.
-        Na Windowsie tylko symuluje działanie. Na Linuksie próbuje użyć `gpio` (wymaga WiringPi).
+        Steruje przekaźnikiem wzmacniacza (przez RelayDriver - backend zależny od RELAY_BACKEND).
+        `trace` (timingStats.EventTrace) dostaje znacznik czasu przełączenia przekaźnika.
         """
-        if platform.system() == "Windows":
-            logger.info(f"Symulacja: Przekaźnik wzmacniacza ustawiony na: {'Włączony' if state else 'Wyłączony'}")
-        else:
+        self.relay.set(state)
+        if trace is not None:
+            trace.mark("amp_switched")
+    
+    def _stop_playback(self):
+        """Zatrzymuje odtwarzanie z pamięci podręcznej i strumieniowe."""
+        if self._channel.get_busy():
+            self._channel.stop()
+        if pygame.mixer.music.get_busy():
+            pygame.mixer.music.stop()
+
+    def _enqueue(self, priority, command, role=None, done=None, trace=None):
+        """Dodaje komendę do kolejki wątku audio."""
+        with self._seq_lock:
+            self._seq += 1
+            seq = self._seq
+            if command == "stop":
+                self._last_stop_seq = seq
+        self._commands.put((priority, seq, command, role, done, trace))
+
+    def _audio_worker(self):
+        """
+        Jedyny wątek sterujący odtwarzaniem. Komendy są pobierane z kolejki priorytetowej
+        (stop > alarm > dzwonek > przeddzwonek > odtwarzanie testowe) i wykonywane sekwencyjnie.
+        Zasady wywłaszczania: nowy dźwięk przerywa bieżący tylko, jeśli ma priorytet
+        wyższy lub równy; w przeciwnym razie jest pomijany. Stop przerywa wszystko,
+        a komendy odtwarzania wydane przed stopem są odrzucane.
+        WAŻNE: Po upływie czasu dźwięku wątek NIE wyłącza wzmacniacza (robi to harmonogram).
+        """
+        current_priority = None  # Priorytet aktualnie odtwarzanego dźwięku
+        clip_deadline = None     # Koniec dźwięku (zegar monotoniczny); None dla alarmu lub ciszy
+        while True:
+            timeout = None if clip_deadline is None else max(0.0, clip_deadline - self.clock.monotonic())
+            try:
+                priority, seq, command, role, done, trace = self._commands.get(timeout=timeout)
+            except queue.Empty:
+                # Upłynął czas dźwięku - zatrzymaj (cisza), wzmacniacz zostaje włączony
+                if self.is_playing():
+                    self._stop_playback()
+                    logger.info("Koniec czasu odtwarzania (muzyka stop, wzmacniacz nadal ON).")
+                self._set_playing_state(None)
+                current_priority, clip_deadline = None, None
+                continue
+
             try:
-                GPIO.setmode(GPIO.BOARD)
-                GPIO.setup(self.AMP_OUTPUT_PIN, GPIO.OUT)
-                GPIO.output(self.AMP_OUTPUT_PIN, GPIO.HIGH if state else GPIO.LOW)
-                logger.info(f"Przekaźnik wzmacniacza GPIO {self.AMP_OUTPUT_PIN} ustawiony na: {'Włączony' if state else 'Wyłączony'}")
+                if command == "stop":
+                    self._stop_playback()
+                    self._set_playing_state(None)
+                    current_priority, clip_deadline = None, None
+                    if role == "amp_off":
+                        self._amp_relay(state=False)
+                elif seq < self._last_stop_seq:
+                    logger.info(f"Pominięto odtwarzanie '{role}' - zatrzymane przed startem.")
+                elif current_priority is not None and priority > current_priority and self.is_playing():
+                    logger.info(f"Pominięto odtwarzanie '{role}' - trwa dźwięk o wyższym priorytecie.")
+                else:
+                    duration = self._start_clip(role, trace)
+                    if duration is None:
+                        current_priority, clip_deadline = None, None
+                    else:
+                        current_priority = priority
+                        clip_deadline = None if role == "alarm" else self.clock.monotonic() + duration
             except Exception as e:
-                logger.error(f"Błąd sterowania GPIO {self.AMP_OUTPUT_PIN}: {e}")
-    
-    def _play_sound_thread(self, file_path, is_alarm=False):
+                logger.error(f"Błąd wątku audio: {e}")
+            finally:
+                if trace is not None:
+                    trace.complete() # Zdarzenie pominięte trafia do statystyk bez etapu audio_started
+                if done is not None:
+                    done.set()
+
+    def _start_clip(self, role, trace=None):
         """
-        Wątek odtwarza dźwięk i kończy go po MAX_MUSIC_LEN.
-        WAŻNE: Ten wątek NIE wyłącza wzmacniacza po zakończeniu.
+        Uruchamia dźwięk danej roli. Zwraca czas odtwarzania w sekundach
+        (dla alarmu 0 - gra w pętli do zatrzymania) lub None, jeśli nie udało się go uruchomić.
+        Dźwięk jest odtwarzany ze zdekodowanego bufora w pamięci, a jeśli pliku nie da się
+        zbuforować (lub nie został jeszcze zdekodowany) - strumieniowo przez pygame.mixer.music.
         """
+        file_path = {"bell": self._musicFileBell, "prebell": self._musicFilePrebell, "alarm": self._musicFileAlarm}[role]
+        if not file_path:
+            logger.warning(f"Brak pliku dźwiękowego dla '{role}'.")
+            return None
+        is_alarm = role == "alarm"
+
+        start = time.perf_counter()
+        # Bez dekodowania w tym wątku - przy braku bufora odtwarzanie strumieniowe
+        sound = self._soundCache.get(file_path, None if is_alarm else MAX_MUSIC_LEN)
+
         sound_duration = 0
         if not is_alarm:
-            full_len = self._get_mp3_length(file_path)
+            full_len = sound.get_length() if sound is not None else self._get_mp3_length(file_path)
             sound_duration = min(full_len, MAX_MUSIC_LEN) # Max 15s
-        
-        with self._play_lock:
-            if self._is_alarm_playing and not is_alarm:
-                return
+            if sound_duration <= 0:
+                sound_duration = 3
 
-            try:
-                if pygame.mixer.music.get_busy():
-                    pygame.mixer.music.stop()
+        try:
+            self._stop_playback()
 
-                # ZAWSZE upewnij się, że wzmacniacz jest włączony przed graniem
-                self._amp_relay(state=True)
+            # ZAWSZE upewnij się, że wzmacniacz jest włączony przed graniem
+            self._amp_relay(state=True, trace=trace)
 
+            loops = -1 if is_alarm else 0
+            if sound is not None:
+                self._channel.play(sound, loops=loops)
+                source = "pamięć"
+            else:
                 pygame.mixer.music.load(file_path)
-                if is_alarm:
-                    pygame.mixer.music.play(-1)
-                    self._is_alarm_playing = True
-                    logger.info(f"START ALARMU: {os.path.basename(file_path)}")
-                else:
-                    pygame.mixer.music.play()
-                    self._is_alarm_playing = False 
-                    logger.info(f"START ODTWARZANIA: {os.path.basename(file_path)} (Max: {sound_duration:.1f}s)")
-            
-            except Exception as e:
-                logger.error(f"Błąd odtwarzania: {e}")
-                self._amp_relay(state=False)
-                return 
+                pygame.mixer.music.play(loops)
+                source = "strumień"
+            latency_ms = (time.perf_counter() - start) * 1000
+            if trace is not None:
+                trace.mark("audio_started")
+        except Exception as e:
+            logger.error(f"Błąd odtwarzania: {e}")
+            self._set_playing_state(None)
+            self._amp_relay(state=False)
+            return None
 
-        # Czekanie na koniec dźwięku
-        if not is_alarm:
-            if sound_duration > 0:
-                time.sleep(sound_duration)
-            else:
-                time.sleep(3)
-            
-            # Po upływie czasu tylko zatrzymaj dźwięk (cisza)
-            # NIE WYŁĄCZAJ WZMACNIACZA - zrobi to schedule.py
-            if pygame.mixer.music.get_busy():
-                pygame.mixer.music.stop()
-                logger.info("Koniec czasu odtwarzania (muzyka stop, wzmacniacz nadal ON).")
-            
-            self.isMusicStopped()
-
-    def playBell(self):
-        # Stopujemy poprzednie, ale nie wyłączamy wzmacniacza (false), bo zaraz będziemy grać
-        self.stopMusic(turn_amp_off=False) 
-        if self._musicFileBell:
-            threading.Thread(target=self._play_sound_thread, args=(self._musicFileBell, False)).start()
-            self._is_bell_playing = True
+        self._set_playing_state(role)
+        if is_alarm:
+            logger.info(f"START ALARMU: {os.path.basename(file_path)} (źródło: {source}, opóźnienie startu: {latency_ms:.1f} ms)")
+        else:
+            logger.info(f"START ODTWARZANIA: {os.path.basename(file_path)} (Max: {sound_duration:.1f}s, źródło: {source}, opóźnienie startu: {latency_ms:.1f} ms)")
+        return sound_duration
+
+    def _set_playing_state(self, role):
+        """Ustawia flagi stanu odtwarzania (wywoływane tylko z wątku audio)."""
+        self._is_alarm_playing = role == "alarm"
+        self._is_bell_playing = role == "bell"
+        self._is_prebell_playing = role == "prebell"
+        self.playingRole.set(role)
+
+    def playBell(self, test=False, trace=None):
+        """
+        Odtwarza dzwonek. `test=True` - odtwarzanie próbne z GUI (najniższy priorytet).
+        `trace` (timingStats.EventTrace) - ślad czasowy zdarzenia z harmonogramu.
+        """
+        self._enqueue(PRIORITY_TEST if test else PRIORITY_BELL, "play", "bell", trace=trace)
         
-    def playPrebell(self):
-        self.stopMusic(turn_amp_off=False)
-        if self._musicFilePrebell:
-            threading.Thread(target=self._play_sound_thread, args=(self._musicFilePrebell, False)).start()
-            self._is_prebell_playing = True
+    def playPrebell(self, test=False, trace=None):
+        """Odtwarza przeddzwonek. `test=True` - odtwarzanie próbne z GUI (najniższy priorytet)."""
+        self._enqueue(PRIORITY_TEST if test else PRIORITY_PREBELL, "play", "prebell", trace=trace)
 
     def playAlarm(self):
-        self.stopMusic(turn_amp_off=False)
-        if self._musicFileAlarm:
-            threading.Thread(target=self._play_sound_thread, args=(self._musicFileAlarm, True)).start()
-            self._is_alarm_playing = True
-
-    def stopMusic(self, turn_amp_off=True):
-        """Ręczne zatrzymanie (np. przycisk w GUI). Domyślnie wyłącza wzmacniacz."""
-        with self._play_lock:
-            if pygame.mixer.music.get_busy():
-                pygame.mixer.music.stop()
-            self._is_alarm_playing = False
-            
-            if turn_amp_off:
-                self._amp_relay(state=False)
-                
-        self.isMusicStopped()
+        """Uruchamia alarm (w pętli, do zatrzymania). Przerywa każdy inny dźwięk."""
+        self._enqueue(PRIORITY_ALARM, "play", "alarm")
+
+    def stopMusic(self, turn_amp_off=True, wait=False):
+        """
+        Ręczne zatrzymanie (np. przycisk w GUI). Domyślnie wyłącza wzmacniacz.
+        `wait=True` czeka, aż wątek audio wykona zatrzymanie (np. przy zamykaniu aplikacji).
+        """
+        done = threading.Event() if wait else None
+        self._enqueue(PRIORITY_STOP, "stop", "amp_off" if turn_amp_off else None, done)
+        if done is not None:
+            done.wait(timeout=2)
 
     def is_playing(self):
-        return pygame.mixer.music.get_busy()
-    
-    def isMusicStopped(self):
-        if not pygame.mixer.music.get_busy():
-            self._is_bell_playing = False
-            self._is_prebell_playing = False
\ No newline at end of file
+        return self._channel.get_busy() or pygame.mixer.music.get_busy()
@@ -1,5 +1,31 @@
+from collections import deque
 import customtkinter as ctk
 
+
+_fonts = {}         # (rodzina, rozmiar, grubość) -> CTkFont
+_theme_colors = {}  # (widżet, klucz) -> kolor z motywu
+
+
+def get_font(family="Calibri", size=22, weight="normal"):
+    """
+    Zwraca wspólny obiekt CTkFont dla danych parametrów (`family=None` - rodzina z motywu).
+    Każda kombinacja jest tworzona raz (jedna czcionka Tcl), zamiast nowej czcionki dla każdego widżetu.
+    """
+    key = (family, size, weight)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = ctk.CTkFont(family=family, size=size, weight=weight)
+    return font
+
+
+def theme_color(widget, key):
+    """Zwraca kolor z bieżącego motywu customtkinter (np. theme_color("CTkButton", "fg_color")), odczytany raz."""
+    color = _theme_colors.get((widget, key))
+    if color is None:
+        color = _theme_colors[(widget, key)] = ctk.ThemeManager.theme[widget][key]
+    return color
+
+
 class MySpinbox(ctk.CTkFrame):
     def __init__(self, master, width=130, height=30, step_size=1, command=None, 
                  variable=None, min_value=None, max_value=None, font=None, **kwargs):
@@ -23,25 +49,25 @@ class MySpinbox(ctk.CTkFrame):
         self.grid_columnconfigure((0, 2), weight=0)
         self.grid_columnconfigure(1, weight=1)
 
-        self.subtract_button = ctk.CTkButton(self, text="-", width=height, height=height, font=ctk.CTkFont(size=22, weight='bold'),
+        self.subtract_button = ctk.CTkButton(self, text="-", width=height, height=height, font=get_font(family=None, size=22, weight='bold'),
                                              command=self._subtract_button_callback)
         self.subtract_button.grid(row=0, column=0, sticky="nswe", padx=4, pady=4)
 
-        self.entry = ctk.CTkEntry(self, width=width - (2 * height), height=height, font=ctk.CTkFont(size=22, weight='bold'),
+        self.entry = ctk.CTkEntry(self, width=width - (2 * height), height=height, font=get_font(family=None, size=22, weight='bold'),
                                   border_width=0, bg_color="#2b2b2b", fg_color="#2b2b2b", justify="center")
         self.entry.grid(row=0, column=1, sticky="nswe", pady=4)
         self.entry.configure(state="readonly")
         if self.font:
             self.entry.configure(font=self.font)
 
-        self.add_button = ctk.CTkButton(self, text="+", width=height, height=height, font=ctk.CTkFont(size=22, weight='bold'),
+        self.add_button = ctk.CTkButton(self, text="+", width=height, height=height, font=get_font(family=None, size=22, weight='bold'),
                                         command=self._add_button_callback)
         self.add_button.grid(row=0, column=2, sticky="nswe", padx=4, pady=4)
 
-        self.subtract_button.configure(fg_color=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkButton"]["fg_color"]), hover=False)
-        self.add_button.configure(fg_color=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkButton"]["fg_color"]), hover=False)
-        self.entry.configure(fg_color=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkFrame"]["fg_color"]),
-                             text_color=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkEntry"]["text_color"]))
+        self.subtract_button.configure(fg_color=self._apply_appearance_mode(theme_color("CTkButton", "fg_color")), hover=False)
+        self.add_button.configure(fg_color=self._apply_appearance_mode(theme_color("CTkButton", "fg_color")), hover=False)
+        self.entry.configure(fg_color=self._apply_appearance_mode(theme_color("CTkFrame", "fg_color")),
+                             text_color=self._apply_appearance_mode(theme_color("CTkEntry", "text_color")))
         self._update_entry_from_variable()
 
     # Dodaj metodę do zarządzania śledzeniem
@@ -87,44 +113,80 @@ class MySpinbox(ctk.CTkFrame):
         self._set_value_and_notify(int(value)) 
 
 
-class NotificationPopup(ctk.CTkToplevel):
+class NotificationOverlay(ctk.CTkToplevel):
     """
-    Niestandardowe okno pop-up do wyświetlania krótkich komunikatów.
-    Zamyka się automatycznie po określonym czasie lub po kliknięciu.
+    Pełnoekranowe okno komunikatów, tworzone raz i ukrywane między komunikatami
+    (zamiast nowego okna dla każdego komunikatu). Komunikaty przychodzące w trakcie
+    wyświetlania innego czekają w kolejce - gdy czekają kolejne, bieżący jest skracany.
+    Komunikat znika po określonym czasie lub po kliknięciu.
     """
-    _closed = False
-    def __init__(self, master, message, duration_ms=2500, color="white"):
+    MAX_QUEUED = 5            # Przy dłuższej kolejce najstarsze oczekujące komunikaty są pomijane
+    BURST_DURATION_MS = 800   # Czas wyświetlania komunikatu, gdy w kolejce czekają następne
+
+    def __init__(self, master):
         super().__init__(master)
+        self.withdraw() # Pokazywane dopiero przy pierwszym komunikacie
         self.config(cursor="none")
         self.master = master
         self.overrideredirect(True)  # Usuwa ramkę okna i przyciski systemowe
         self.attributes("-topmost", True)  # Zawsze na wierzchu innych okien aplikacji
-        self.update_idletasks()
-        master_x = self.master.winfo_rootx()
-        master_y = self.master.winfo_rooty()
-        master_w = self.master.winfo_screenwidth()
-        master_h = self.master.winfo_screenheight()
-        self.geometry(f"{master_w}x{master_h}+{master_x}+{master_y}")
-        
-        self.label = ctk.CTkLabel(self, text=message, font=("Calibri", 40, "bold"), text_color=color, anchor="center")
+        self.attributes("-alpha", 0.95)
+
+        self.label = ctk.CTkLabel(self, text="", font=("Calibri", 40, "bold"), anchor="center")
         self.label.pack(fill="both", expand=True, padx=20, pady=20)
-        
-        #self.grab_set() # Zablokuj interakcję z innymi oknami aplikacji, dopóki pop-up jest otwarty
-        self.bind("<Button-1>", self.close_popup) # Zamyka po kliknięciu
-        self.label.bind("<Button-1>", self.close_popup)
-        
+        self.bind("<Button-1>", self._show_next) # Kliknięcie zamyka bieżący komunikat
+        self.label.bind("<Button-1>", self._show_next)
 
+        self._queue = deque()    # Oczekujące komunikaty: (treść, czas ms, kolor)
+        self._current = None
+        self._hide_job = None
+        self._geometry = None
 
+    def show(self, message, duration_ms=2500, color="white"):
+        """Dodaje komunikat do kolejki i wraca od razu. Komunikat identyczny z ostatnim nie jest powtarzany."""
+        item = (message, duration_ms, color)
+        last = self._queue[-1] if self._queue else self._current
+        if item == last and not self._queue:
+            self._schedule_hide(duration_ms) # Ten sam komunikat jest już widoczny - wydłuż jego wyświetlanie
+            return
+        if item == last:
+            return
+        if len(self._queue) >= self.MAX_QUEUED:
+            self._queue.popleft()
+        self._queue.append(item)
+        if self._current is None:
+            self._show_next()
+        else:
+            self._schedule_hide(self.BURST_DURATION_MS) # Skróć bieżący - czekają następne
 
-        self.attributes("-alpha", 0.95)
-        self._closed = False
-        self.after(duration_ms, self.close_popup) # Ustaw timer na automatyczne zamknięcie
+    def _show_next(self, event=None):
+        if not self._queue:
+            self._cancel_hide()
+            self._current = None
+            self.withdraw()
+            return
+        message, duration_ms, color = self._current = self._queue.popleft()
+        self.label.configure(text=message, text_color=color)
+        self._update_geometry()
+        self.deiconify()
+        self.lift()
+        self._schedule_hide(self.BURST_DURATION_MS if self._queue else duration_ms)
+
+    def _schedule_hide(self, delay_ms):
+        self._cancel_hide()
+        self._hide_job = self.after(delay_ms, self._show_next)
+
+    def _cancel_hide(self):
+        if self._hide_job is not None:
+            self.after_cancel(self._hide_job)
+            self._hide_job = None
 
-    def close_popup(self, event=None):
-        """Zamyka okno pop-up."""
-        if not self._closed and self.winfo_exists(): # Sprawdź, czy okno jeszcze istnieje przed zniszczeniu
-            self._closed = True
-            self.destroy()
+    def _update_geometry(self):
+        """Dopasowuje okno do ekranu (bez update_idletasks - okno główne jest już wyświetlone)."""
+        geometry = f"{self.master.winfo_screenwidth()}x{self.master.winfo_screenheight()}+{self.master.winfo_rootx()}+{self.master.winfo_rooty()}"
+        if geometry != self._geometry:
+            self.geometry(geometry)
+            self._geometry = geometry
 
 
 class MyButton(ctk.CTkButton):
@@ -133,7 +195,7 @@ class MyButton(ctk.CTkButton):
         kwargs.setdefault("hover", False)
         kwargs.setdefault("width", 280)
         kwargs.setdefault("height", 90)
-        kwargs.setdefault("font", ctk.CTkFont(family="Calibri", size=22, weight="bold"))
+        kwargs.setdefault("font", get_font(size=22, weight="bold"))
         super().__init__(*args, **kwargs)
 
 class ScheduleButton(ctk.CTkButton):
@@ -142,11 +204,116 @@ class ScheduleButton(ctk.CTkButton):
         kwargs.setdefault("hover", False)
         kwargs.setdefault("width", 210)
         kwargs.setdefault("height", 80)
-        kwargs.setdefault("font", ctk.CTkFont(family="Calibri", size=22, weight="bold"))
+        kwargs.setdefault("font", get_font(size=22, weight="bold"))
         super().__init__(*args, **kwargs)
 
 class MyLabel(ctk.CTkLabel):
     """Niestandardowa etykieta z predefiniowanymi stylami."""
     def __init__(self, *args, **kwargs):
-        kwargs.setdefault("font", ctk.CTkFont(family="Calibri", size=22, weight="bold"))
+        kwargs.setdefault("font", get_font(size=22, weight="bold"))
         super().__init__(*args, **kwargs)        
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Lista tekstów w kilku kolumnach, która ma etykiety tylko dla widocznych wierszy.
+    Przy przewijaniu te same etykiety dostają nowe teksty, więc liczba widżetów
+    i czas odświeżenia nie zależą od długości listy.
+    Przewijanie: pasek przewijania, kółko myszy lub przeciąganie palcem po liście.
+    """
+    def __init__(self, master, visible_rows=6, columns=2, row_height=55, scrollbar_width=30, **kwargs):
+        super().__init__(master, height=visible_rows * row_height, **kwargs)
+        self.visible_rows = visible_rows
+        self.columns = columns
+        self.row_height = row_height
+        self._items = []
+        self._first_row = 0        # Indeks wiersza listy widocznego na górze
+        self._drag_start = None    # (y ekranu, pierwszy wiersz) na początku przeciągania
+
+        self.grid_propagate(False)
+        self.grid_columnconfigure(tuple(range(columns)), weight=1, uniform="column")
+        self.grid_rowconfigure(tuple(range(visible_rows)), weight=1, uniform="row")
+
+        self._cells = []  # [ramka, etykieta, czy widoczna] dla każdego miejsca w siatce
+        for row in range(visible_rows):
+            for col in range(columns):
+                frame = ctk.CTkFrame(self, corner_radius=0)
+                frame.grid(row=row, column=col, padx=5, pady=2, sticky="nsew")
+                label = MyLabel(frame, text="", anchor="center", corner_radius=5)
+                label.pack(fill="both", expand=True, padx=5, pady=3)
+                self._bind_scrolling(frame)
+                self._bind_scrolling(label)
+                self._cells.append([frame, label, True])
+
+        self.scrollbar = ctk.CTkScrollbar(self, width=scrollbar_width, hover=False, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=columns, rowspan=visible_rows, sticky="ns", padx=(0, 2))
+        self._bind_scrolling(self)
+        self._render()
+
+    def _bind_scrolling(self, widget):
+        widget.bind("<ButtonPress-1>", self._on_drag_start, add="+")
+        widget.bind("<B1-Motion>", self._on_drag_motion, add="+")
+        widget.bind("<ButtonRelease-1>", self._on_drag_end, add="+")
+        widget.bind("<MouseWheel>", self._on_mouse_wheel, add="+")
+        widget.bind("<Button-4>", lambda event: self.scroll_to_row(self._first_row - 1), add="+")  # Kółko myszy na Linuksie
+        widget.bind("<Button-5>", lambda event: self.scroll_to_row(self._first_row + 1), add="+")
+
+    @property
+    def row_count(self):
+        return (len(self._items) + self.columns - 1) // self.columns
+
+    def set_items(self, items):
+        """Ustawia teksty listy. Odświeżane są tylko etykiety, których tekst się zmienił."""
+        self._items = items
+        self._first_row = max(0, min(self._first_row, self.row_count - self.visible_rows))
+        self._render()
+
+    def scroll_to_row(self, row):
+        """Przewija listę tak, aby wiersz `row` był na górze (w dozwolonym zakresie)."""
+        row = max(0, min(row, self.row_count - self.visible_rows))
+        if row != self._first_row:
+            self._first_row = row
+            self._render()
+
+    def _render(self):
+        for i, cell in enumerate(self._cells):
+            frame, label, visible = cell
+            index = (self._first_row + i // self.columns) * self.columns + i % self.columns
+            if index < len(self._items):
+                if not visible:
+                    frame.grid()
+                    cell[2] = True
+                if label.cget("text") != self._items[index]:
+                    label.configure(text=self._items[index])
+            elif visible:
+                frame.grid_remove()
+                cell[2] = False
+
+        rows = self.row_count
+        if rows <= self.visible_rows:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self._first_row / rows, (self._first_row + self.visible_rows) / rows)
+
+    def _on_scrollbar(self, *args):
+        """Obsługa paska przewijania (komendy w formacie Tk: "moveto", ułamek lub "scroll", liczba, jednostka)."""
+        if args[0] == "moveto":
+            self.scroll_to_row(round(float(args[1]) * self.row_count))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_to_row(self._first_row + int(args[1]) * step)
+
+    def _on_mouse_wheel(self, event):
+        self.scroll_to_row(self._first_row - (1 if event.delta > 0 else -1))
+
+    def _on_drag_start(self, event):
+        self._drag_start = (event.y_root, self._first_row)
+
+    def _on_drag_motion(self, event):
+        if self._drag_start is None:
+            return
+        start_y, start_row = self._drag_start
+        self.scroll_to_row(start_row + round((start_y - event.y_root) / self.row_height))
+
+    def _on_drag_end(self, event):
+        self._drag_start = None
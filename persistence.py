@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import logging
+
+from constants import SCHEDULE_SAVE_DEBOUNCE_SECONDS
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def backup_path(path):
+    """Ścieżka kopii ostatniej poprawnej wersji pliku."""
+    return path + ".bak"
+
+
+def _fsync_directory(path):
+    """Utrwala wpis katalogu po zmianie nazwy pliku (na Windowsie niedostępne - pomijane)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _is_valid_json(path, validate=None):
+    """Czy plik zawiera poprawny JSON (i przechodzi sprawdzenie `validate`, jeśli podano)."""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        if validate is not None:
+            validate(data)
+        return True
+    except (IOError, ValueError):
+        return False
+
+
+def atomic_write_json(path, data, validate=None):
+    """
+    Zapisuje dane do pliku JSON odpornie na zanik zasilania:
+    plik tymczasowy + fsync + atomowa zamiana nazwy. Poprzednia (poprawna) wersja
+    pliku zostaje zachowana jako kopia `.bak`.
+    `validate(dane)` zgłasza ValueError dla danych o nieprawidłowej strukturze - taki plik nie trafia do kopii.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    # Do kopii trafia tylko poprawny plik - uszkodzony nie nadpisze ostatniej dobrej wersji
+    if os.path.exists(path) and _is_valid_json(path, validate):
+        os.replace(path, backup_path(path))
+    os.replace(tmp_path, path)
+    _fsync_directory(path)
+
+
+def load_json_with_backup(path, parse=None):
+    """
+    Wczytuje plik JSON, a jeśli jest uszkodzony lub go brakuje - jego kopię `.bak`.
+    `parse(dane)` zamienia odczytane dane na wynik; ValueError oznacza nieprawidłową strukturę
+    i również powoduje użycie kopii.
+    Zwraca (wynik, ścieżka źródła) lub (None, None), gdy żadnej wersji nie da się odczytać.
+    """
+    for candidate in (path, backup_path(path)):
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, "r") as f:
+                data = json.load(f)
+            if parse is not None:
+                data = parse(data)
+            if candidate != path:
+                logger.warning(f"Plik {path} jest uszkodzony lub nie istnieje - odtworzono harmonogram z kopii {candidate}")
+            return data, candidate
+        except (IOError, ValueError) as e:
+            logger.error(f"Błąd odczytu pliku {candidate}: {e}")
+    return None, None
+
+
+class DebouncedJsonWriter:
+    """
+    Jeden wątek zapisujący plik JSON. Seria zmian w krótkim czasie (np. kilka kliknięć
+    "Zapisz zmiany", dodawanie i usuwanie dzwonków) jest łączona w jeden zapis,
+    wykonany `debounce` sekund po ostatniej zmianie.
+    """
+    def __init__(self, path, debounce=SCHEDULE_SAVE_DEBOUNCE_SECONDS, name="ScheduleWriter", validate=None):
+        self.path = path
+        self.validate = validate # Sprawdzenie struktury pliku przed przeniesieniem go do kopii .bak
+        self.debounce = debounce
+        self._pending = None     # Najnowsze dane czekające na zapis
+        self._callbacks = []     # Funkcje callback(error) wywoływane po zapisie (error=None - sukces)
+        self._flush = False
+        self._writing = False
+        self.lastWritten = None  # Dane ostatniego udanego zapisu (do rozpoznania własnych zmian pliku)
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, name=name, daemon=True).start()
+
+    def request(self, data, callback=None):
+        """Zleca zapis danych (kopii - nie mogą być później modyfikowane). Nie blokuje."""
+        with self._cond:
+            self._pending = data
+            if callback is not None:
+                self._callbacks.append(callback)
+            self._cond.notify_all()
+
+    @property
+    def hasPending(self):
+        """Czy są zmiany czekające na zapis (lub zapis właśnie trwa)."""
+        return self._pending is not None or self._writing
+
+    def flush(self, timeout=5):
+        """Zapisuje oczekujące dane natychmiast i czeka na zakończenie zapisu (np. przy zamykaniu)."""
+        with self._cond:
+            if self._pending is not None:
+                self._flush = True
+                self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None)
+                # Czekaj, aż przez `debounce` sekund nie pojawi się nowa zmiana
+                while not self._flush:
+                    data = self._pending
+                    if self._cond.wait_for(lambda: self._pending is not data or self._flush, self.debounce):
+                        continue
+                    break
+                data, self._pending = self._pending, None
+                callbacks, self._callbacks = self._callbacks, []
+                self._flush = False
+                self._writing = True
+
+            error = None
+            # Ustawione przed zapisem - obserwator pliku może go odczytać zaraz po podmianie
+            self.lastWritten = data
+            try:
+                atomic_write_json(self.path, data, self.validate)
+                logger.info(f"Harmonogram zapisany do: {self.path}")
+            except (IOError, OSError, TypeError, ValueError) as e:
+                error = e
+                logger.error(f"Błąd zapisu pliku {self.path}: {e}")
+
+            for callback in callbacks:
+                try:
+                    callback(error)
+                except Exception as e:
+                    logger.error(f"Błąd w funkcji zwrotnej zapisu: {e}")
+
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
@@ -0,0 +1,102 @@
+import platform
+import threading
+import logging
+
+from constants import RELAY_BACKEND
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class GpioBackend:
+    """Backend sprzętowy: moduł zgodny z RPi.GPIO (prawdziwy RPi.GPIO lub zaślepka fake_rpi)."""
+    def __init__(self, gpio, name):
+        self.gpio = gpio
+        self.name = name
+
+    def setup(self, pin):
+        self.gpio.setmode(self.gpio.BOARD)
+        self.gpio.setup(pin, self.gpio.OUT)
+
+    def write(self, pin, state):
+        self.gpio.output(pin, self.gpio.HIGH if state else self.gpio.LOW)
+
+
+class RecorderBackend:
+    """Backend w pamięci: zapamiętuje wszystkie operacje (do testów i uruchomień bez GPIO)."""
+    name = "recorder"
+
+    def __init__(self):
+        self.setups = []
+        self.writes = []  # lista (pin, stan)
+
+    def setup(self, pin):
+        self.setups.append(pin)
+
+    def write(self, pin, state):
+        self.writes.append((pin, state))
+
+
+def create_backend(name=RELAY_BACKEND):
+    """
+    Tworzy backend przekaźnika: "rpi", "fake", "recorder" lub "auto"
+    (fake_rpi na Windowsie, RPi.GPIO na pozostałych systemach).
+    Jeśli biblioteki GPIO nie da się zaimportować, używany jest backend "recorder".
+    """
+    if name == "auto":
+        name = "fake" if platform.system() == "Windows" else "rpi"
+    try:
+        if name == "rpi":
+            import RPi.GPIO as GPIO
+            return GpioBackend(GPIO, "rpi")
+        if name == "fake":
+            from fake_rpi.RPi import GPIO
+            return GpioBackend(GPIO, "fake")
+    except (ImportError, RuntimeError) as e:
+        logger.error(f"Nie można załadować biblioteki GPIO ({name}): {e}. Przekaźnik będzie tylko symulowany.")
+        return RecorderBackend()
+    if name != "recorder":
+        logger.error(f"Nieznany backend przekaźnika: {name}. Przekaźnik będzie tylko symulowany.")
+    return RecorderBackend()
+
+
+class RelayDriver:
+    """
+    Sterownik przekaźnika na jednym pinie GPIO.
+    Pin jest konfigurowany tylko raz (przy pierwszym zapisie), a zapamiętany stan logiczny
+    pozwala pominąć zapisy, które niczego nie zmieniają (np. ponowne włączenie już włączonego
+    wzmacniacza). Liczniki `writes`/`skipped` pozwalają sprawdzić, ile zapisów trafia na pin.
+    """
+    def __init__(self, pin, backend=None):
+        self.pin = pin
+        self.backend = backend if backend is not None else create_backend()
+        self.writes = 0
+        self.skipped = 0
+        self._state = None  # None - stan nieznany (przed pierwszym zapisem lub po błędzie)
+        self._initialised = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        return self._state
+
+    def set(self, state: bool):
+        """Ustawia stan przekaźnika. Zwraca True, jeśli zapis trafił na pin."""
+        state = bool(state)
+        with self._lock:
+            if self._state == state:
+                self.skipped += 1
+                return False
+            try:
+                if not self._initialised:
+                    self.backend.setup(self.pin)
+                    self._initialised = True
+                self.backend.write(self.pin, state)
+            except Exception as e:
+                self._state = None # Następny zapis zostanie ponowiony niezależnie od stanu
+                logger.error(f"Błąd sterowania GPIO {self.pin}: {e}")
+                return False
+            self._state = state
+            self.writes += 1
+        logger.info(f"Przekaźnik wzmacniacza GPIO {self.pin} ({self.backend.name}) ustawiony na: {'Włączony' if state else 'Wyłączony'}")
+        return True
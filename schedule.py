@@ -3,6 +3,12 @@ import json
 import os
 import logging
 import constants
+from persistence import DebouncedJsonWriter, load_json_with_backup
+from fileWatch import PathWatcher
+from timeline import compileTimeline, SECONDS_PER_DAY, PLAY_BELL, PLAY_PREBELL, TURN_AMP_OFF
+from bellTable import BellTable, format_time
+from clockHandling import systemClock
+from viewModel import Observable
 
 # Konfiguracja logowania dla modułu schedule
 logger = logging.getLogger(__name__)
@@ -13,14 +19,13 @@ class scheduleHandling:
     Klasa odpowiedzialna za zarządzanie harmonogramem dzwonków,
     ładowanie/zapisywanie danych oraz sprawdzanie aktualnego stanu.
     """
-    def __init__(self):
-        self.data = {
-            "bellSchedule": [],        # Lista czasów dzwonków (np. ["08:00", "12:30"])
-            "prebellIntervals": [],    # Lista interwałów przeddzwonka (np. [1, 0.5])
-            "bellActive": []           # Lista statusów aktywności dzwonków (np. [True, False])
-        }
+    def __init__(self, path=None, clock=None):
+        self.bells = BellTable()       # Dzwonki: minuta doby, przeddzwonek w sekundach, aktywność
         self.noWeekend = True          # Czy dzwonki są wyłączone w weekend
-        self.nextOccurrence = None     # Następny zaplanowany dzwonek
+        self.maxBells = constants.MAX_BELLS  # Limit dzwonków przy dodawaniu (pole "max_bells" w pliku)
+        self.version = 0               # Zwiększana przy każdej zmianie harmonogramu
+        self._formattedCache = None    # (wersja, sformatowana lista dzwonków)
+        self.nextOccurrenceState = Observable(None)  # Opis następnego dzwonka (z wersją - dla GUI)
         
         # Flagi, które będą ustawiane przez checkSchedule, informując o potrzebie akcji
         self.timeTo = {
@@ -30,153 +35,321 @@ class scheduleHandling:
             "turnAmpOff": False
         }
         
-        self.__scheduleLocation = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Files/schedule.json") if not constants.SCHEDULE_PATH_LINUX else constants.SCHEDULE_PATH_LINUX
+        self._timeline = None            # Skompilowana oś czasu zdarzeń (timeline.CompiledTimeline)
+        self._cursorTimeline = None      # Oś czasu, do której odnosi się kursor
+        self._cursorDay = None           # Doba, do której odnosi się kursor
+        self._cursor = 0                 # Indeks pierwszego zdarzenia, które jeszcze nie wystąpiło w tej dobie
+        self._lastTick = None            # Czas poprzedniego sprawdzenia harmonogramu
+        self._lastTickTimeline = None    # Oś czasu użyta przy poprzednim sprawdzeniu
+        self.eventStats = {"late": 0, "missed": 0}  # Liczniki spóźnionych i utraconych zdarzeń
+        self.firedEvents = []            # Zdarzenia wyzwolone w ostatnim sprawdzeniu: (typ, czas zaplanowany, czas wykrycia)
+        self._listeners = []             # Funkcje wywoływane po każdej zmianie harmonogramu
+        self._pendingReload = None       # Nowy harmonogram z pliku, czekający na podmianę między tickami
+        self._fileSignature = None       # (mtime, rozmiar) ostatnio sprawdzonej wersji pliku
+        self._watcher = None
+        self.clock = clock if clock is not None else systemClock  # Źródło czasu (VirtualClock w symulacji)
+
+        if path is None:
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Files/schedule.json") if not constants.SCHEDULE_PATH_LINUX else constants.SCHEDULE_PATH_LINUX
+        self.__scheduleLocation = path
+        self._writer = DebouncedJsonWriter(path, validate=_parse_schedule_data) # Jeden wątek zapisujący, zapisy atomowe z kopią .bak
         self._loadScheduleFromJson()
+        self._sort_schedule()
+        self._compileTimeline()
         self.checkSchedule()
 
+    @property
+    def nextOccurrence(self):
+        """Opis następnego zaplanowanego dzwonka."""
+        return self.nextOccurrenceState.value
+
+    @nextOccurrence.setter
+    def nextOccurrence(self, value):
+        self.nextOccurrenceState.set(value)
+
     def _loadScheduleFromJson(self):
-        """Ładuje harmonogram z pliku JSON."""
+        """Ładuje harmonogram z pliku JSON (lub z kopii ostatniej poprawnej wersji, jeśli plik jest uszkodzony)."""
+        self._fileSignature = self._stat_file()
+        parsed, source = load_json_with_backup(self.__scheduleLocation, _parse_schedule_data)
+        if parsed is not None:
+            self.bells, self.noWeekend, self.maxBells = parsed
+            logger.info(f"Harmonogram załadowany z: {source}")
+            return
         if os.path.exists(self.__scheduleLocation):
-            try:
-                with open(self.__scheduleLocation, 'r') as f:
-                    data_to_read = json.load(f)
-                    self.data["bellSchedule"] = data_to_read.get('bell_schedule', [])
-                    self.data["prebellIntervals"] = data_to_read.get('pre_bell_intervals', [])
-                    self.data["bellActive"] = data_to_read.get('pre_bell_active', [])
-                    self.noWeekend = data_to_read.get('no_weekend', True)
-                logger.info(f"Harmonogram załadowany z: {self.__scheduleLocation}")
-            except json.JSONDecodeError as e:
-                logger.error(f"Błąd dekodowania JSON z pliku {self.__scheduleLocation}: {e}")
-                # W przypadku błędu dekodowania, można zainicjalizować puste dane
-                self.data = {"bellSchedule": [], "prebellIntervals": [], "bellActive": []}
-                self.noWeekend = True
-            except IOError as e:
-                logger.error(f"Błąd odczytu pliku {self.__scheduleLocation}: {e}")
-                # W przypadku błędu odczytu, można zainicjalizować puste dane
-                self.data = {"bellSchedule": [], "prebellIntervals": [], "bellActive": []}
-                self.noWeekend = True
+            # Plik i kopia są nieczytelne - pusty harmonogram, plik zostanie nadpisany przy następnej zmianie
+            logger.error(f"Nie można odczytać harmonogramu ani jego kopii: {self.__scheduleLocation}. Używam pustego harmonogramu.")
+            self.bells = BellTable()
+            self.noWeekend = True
+            self.maxBells = constants.MAX_BELLS
         else:
             logger.warning(f"Plik harmonogramu nie istnieje: {self.__scheduleLocation}. Tworzenie pustego harmonogramu.")
             self.saveScheduleToJson() # Zapisz pusty harmonogram
 
+    def _stat_file(self):
+        try:
+            st = os.stat(self.__scheduleLocation)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def startWatching(self):
+        """Uruchamia obserwację pliku harmonogramu - zmiany wprowadzone z zewnątrz są wczytywane bez restartu."""
+        if self._watcher is None:
+            self._watcher = PathWatcher(self._onFileChanged, constants.SCHEDULE_WATCH_POLL_SECONDS, name="ScheduleWatcher")
+            self._watcher.watch([self.__scheduleLocation])
+            self._watcher.start()
+
+    def stopWatching(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def _onFileChanged(self):
+        """
+        Wywoływana w wątku obserwatora po zmianie w katalogu harmonogramu.
+        Plik jest parsowany i sprawdzany poza wątkiem planisty; gotowy, skompilowany harmonogram
+        czeka w `_pendingReload` na podmianę w applyPendingReload().
+        """
+        signature = self._stat_file()
+        if signature is None or signature == self._fileSignature:
+            return # Zmienił się inny plik w katalogu (np. kopia .bak) albo plik zniknął w trakcie podmiany
+        self._fileSignature = signature
+        try:
+            with open(self.__scheduleLocation, 'r') as f:
+                raw = json.load(f)
+            bells, no_weekend, max_bells = _parse_schedule_data(raw)
+            bells.sort()
+        except (IOError, ValueError) as e:
+            logger.error(f"Zmieniony plik harmonogramu jest nieprawidłowy, pozostaje poprzedni harmonogram: {e}")
+            return
+
+        if raw == self._writer.lastWritten:
+            return # Plik zapisany przez tę aplikację
+        if self._writer.hasPending:
+            logger.warning("Plik harmonogramu zmieniony z zewnątrz podczas zapisywania lokalnych zmian - zmiana z pliku zostanie nadpisana.")
+            return
+        if bells == self.bells and no_weekend == self.noWeekend and max_bells == self.maxBells:
+            logger.info("Plik harmonogramu zmieniony, ale jego zawartość jest taka sama.")
+            return
+
+        timeline = compileTimeline(bells)
+        self._pendingReload = (bells, no_weekend, max_bells, timeline)
+        logger.info(f"Wczytano zmieniony plik harmonogramu: {len(bells)} dzwonków.")
+        for listener in self._listeners:
+            listener()
+
+    def applyPendingReload(self):
+        """
+        Podmienia harmonogram na wczytany z pliku (jeśli czeka). Wywoływana przez planistę
+        między tickami, więc checkSchedule nigdy nie widzi połowicznie podmienionych danych.
+        Zwraca True, jeśli harmonogram został podmieniony.
+        """
+        pending, self._pendingReload = self._pendingReload, None
+        if pending is None:
+            return False
+        self.bells, self.noWeekend, self.maxBells, self._timeline = pending
+        self.version += 1
+        return True
+
+    def _compileTimeline(self):
+        """
+        Kompiluje harmonogram do posortowanej osi czasu zdarzeń.
+        Wywoływane po załadowaniu lub edycji harmonogramu, a nie przy każdym ticku.
+        """
+        self._timeline = compileTimeline(self.bells)
+        self.version += 1
+        logger.debug(f"Skompilowano oś czasu: {len(self._timeline)} zdarzeń.")
+        for listener in self._listeners:
+            listener()
+
+    def addListener(self, callback):
+        """Rejestruje funkcję wywoływaną po każdej zmianie harmonogramu (np. przeplanowanie timera)."""
+        self._listeners.append(callback)
+
     def checkSchedule(self):
         """
         Sprawdza harmonogram i aktualizuje flagi dotyczące dzwonienia.
-        Ta funkcja jest wywoływana co sekundę w głównej pętli aplikacji (BellApp._update_main_loop).
+        Wywoływana przez BellScheduler w momencie kolejnego zdarzenia (lub co sekundę w trybie "poll").
+
+        Wyzwalanie jest zboczowe: każde zdarzenie z przedziału (poprzednie sprawdzenie, teraz]
+        wyzwala się dokładnie raz, nawet jeśli pętla się zawiesiła. Dzwonki spóźnione o więcej
+        niż MAX_EVENT_LATENESS_SECONDS są pomijane i logowane jako utracone.
+        Koszt jednego wywołania nie zależy od liczby dzwonków - zdarzenia są wyszukiwane binarnie
+        w skompilowanej osi czasu, począwszy od kursora z poprzedniego wywołania.
         """
-        now = datetime.now()
+        now = self.clock.now()
         
         # Resetuj flagi przed każdą kontrolą, aby uniknąć wielokrotnego wyzwalania
         for key in self.timeTo:
             self.timeTo[key] = False
+        self.firedEvents = []
+
+        timeline = self._timeline
+        last_tick = self._lastTick
+        previous_timeline, self._lastTickTimeline = self._lastTickTimeline, timeline
+        self._lastTick = now
+
+        if last_tick is None:
+            pass # Pierwsze sprawdzenie - brak przedziału do obsłużenia
+        elif now < last_tick or now - last_tick > timedelta(days=1):
+            logger.warning(f"Skok zegara systemowego ({last_tick:%Y-%m-%d %H:%M:%S} -> {now:%Y-%m-%d %H:%M:%S}), pomijanie zaległych zdarzeń.")
+            self._cursorTimeline = None
+        else:
+            # Po podmianie osi czasu (edycja, wczytanie pliku) nadrabiane są tylko zdarzenia obecne także
+            # w poprzedniej osi - inaczej dzwonek przestawiony na minioną przed chwilą godzinę zadzwoniłby od razu
+            self._fireDueEvents(timeline, last_tick, now, previous_timeline)
 
         if self.noWeekend and now.weekday() >= 5:  # Sobota (5) lub Niedziela (6)
             self.nextOccurrence = "Brak dzwonków w weekend"
             return
 
-        active_bells = []
-        for i, bell_time_str in enumerate(self.data["bellSchedule"]):
-            if self.data["bellActive"][i]:
-                try:
-                    # Załóżmy, że dzwonki są dla bieżącego dnia
-                    bell_time = datetime.strptime(bell_time_str, "%H:%M").replace(year=now.year, month=now.month, day=now.day)
-                    active_bells.append((bell_time, self.data["prebellIntervals"][i]))
-                except ValueError as e:
-                    logger.error(f"Błąd parsowania czasu dzwonka '{bell_time_str}': {e}")
-                    continue
+        # Znajdź następne zdarzenie (dzwonek)
+        second = now.hour * 3600 + now.minute * 60 + now.second
+        next_bell_second = timeline.nextBellSecond(second)
+        if next_bell_second is None:
+            # Dzwonki przeszły już dzisiaj, więc następny jest jutro (najwcześniejszy)
+            next_bell_second = timeline.firstBellSecond()
+        if next_bell_second is None:
+            self.nextOccurrence = "Brak aktywnych dzwonków"
+        else:
+            self.nextOccurrence = "Następny dzwonek o " + format_time(next_bell_second // 60)
 
-        active_bells.sort() # Sortuj, aby łatwo znaleźć następne zdarzenie
+    def _fireDueEvents(self, timeline, last_tick, now, previous=None):
+        """
+        Ustawia flagi `timeTo` dla wszystkich zdarzeń z przedziału (last_tick, now].
+        Jeśli oś czasu różni się od poprzedniej (`previous`), wyzwalane są tylko zdarzenia występujące w obu.
+        """
+        day = last_tick.date()
+        while day <= now.date():
+            midnight = datetime.combine(day, datetime.min.time())
+            start = (last_tick - midnight).total_seconds() if day == last_tick.date() else -1
+            end = (now - midnight).total_seconds() if day == now.date() else SECONDS_PER_DAY
 
-        found_next_occurrence = False
-        self.nextOccurrence = "Brak dzwonków" # Domyślna wartość, jeśli nie ma aktywnych
+            # Kontynuacja tej samej doby i tej samej osi czasu - szukaj od kursora
+            cursor = 0
+            if timeline is self._cursorTimeline and day == self._cursorDay:
+                cursor = self._cursor
+            lo, hi = timeline.eventRange(start, end, cursor)
+            self._cursorTimeline, self._cursorDay, self._cursor = timeline, day, hi
 
-        for bell_time, prebell_interval in active_bells:               
-            prebell_time = bell_time - timedelta(minutes=prebell_interval)
-            if prebell_interval == 0:
-                turn_amp_on_time = bell_time - timedelta(seconds=10) # 10 sekund przed dzwonkiem
-            else:
-                turn_amp_on_time = prebell_time - timedelta(seconds=10) # 10 sekund przed przeddzwonkiem
-            turn_amp_off_time = bell_time + timedelta(seconds=20) # 10 sekundy po dzwonku (na zakończenie dźwięku)
+            known = None
+            if previous is not None and previous is not timeline:
+                previous_lo, previous_hi = previous.eventRange(start, end)
+                known = {(previous.times[j], previous.kinds[j], previous.bellMinutes[j]) for j in range(previous_lo, previous_hi)}
+            for i in range(lo, hi):
+                if known is not None and (timeline.times[i], timeline.kinds[i], timeline.bellMinutes[i]) not in known:
+                    continue
+                if not self._isSuppressed(timeline, i, day):
+                    self._fireEvent(timeline.kinds[i], timeline.bellMinutes[i], midnight + timedelta(seconds=timeline.times[i]), now)
+            day += timedelta(days=1)
 
-            # Sprawdź, czy aktualny czas jest w przedziale aktywacji dla każdej akcji
-            # Używamy małego okna czasowego (np. 1 sekunda), aby akcja wyzwoliła się tylko raz
-            
-            # Włączenie wzmacniacza
-            if now >= turn_amp_on_time and now < turn_amp_on_time + timedelta(seconds=1):
-                self.timeTo["turnAmpOn"] = True
-                logger.info(f"Akcja: turnAmpOn dla dzwonka o {bell_time.strftime('%H:%M')}")
-            
-            # Odtworzenie przeddzwonka
-            if prebell_interval != 0:
-                if now >= prebell_time and now < prebell_time + timedelta(seconds=1):
-                    self.timeTo["playPrebell"] = True
-                    logger.info(f"Akcja: playPrebell dla dzwonka o {bell_time.strftime('%H:%M')}")
-
-            # Odtworzenie dzwonka
-            if now >= bell_time and now < bell_time + timedelta(seconds=1):
-                self.timeTo["playBell"] = True
-                logger.info(f"Akcja: playBell dla dzwonka o {bell_time.strftime('%H:%M')}")
-            
-            # Wyłączenie wzmacniacza
-            if now >= turn_amp_off_time and now < turn_amp_off_time + timedelta(seconds=1):
-                self.timeTo["turnAmpOff"] = True
-                logger.info(f"Akcja: turnAmpOff dla dzwonka o {bell_time.strftime('%H:%M')}")
+    def _isSuppressed(self, timeline, i, day):
+        """
+        Czy zdarzenie `i` osi czasu w dobie `day` jest pomijane, bo jego dzwonek przypada w weekend.
+        Liczy się doba dzwonka, a nie zdarzenia (przeddzwonek o 23:59 w piątek należy do sobotniego dzwonka).
+        Wyłączenie wzmacniacza nie jest nigdy pomijane, aby nie pozostał włączony do poniedziałku.
+        """
+        if not self.noWeekend or timeline.kinds[i] == TURN_AMP_OFF:
+            return False
+        return (day + timedelta(days=timeline.dayOffsets[i])).weekday() >= 5  # Sobota (5) lub Niedziela (6)
 
+    def _fireEvent(self, kind, bell_minute, event_time, now):
+        """Wyzwala pojedyncze zdarzenie lub - jeśli jest zbyt spóźnione - odnotowuje je jako utracone."""
+        lateness = (now - event_time).total_seconds()
+        # Wzmacniacz przełączamy zawsze, aby nie pozostał włączony po zawieszeniu pętli
+        if kind in (PLAY_BELL, PLAY_PREBELL) and lateness > constants.MAX_EVENT_LATENESS_SECONDS:
+            self.eventStats["missed"] += 1
+            logger.warning(f"Utracono zdarzenie {kind} dla dzwonka o {format_time(bell_minute)} (spóźnienie {lateness:.1f}s).")
+            return
+        if lateness > constants.EVENT_LATE_THRESHOLD_SECONDS:
+            self.eventStats["late"] += 1
+            logger.warning(f"Spóźnione zdarzenie {kind} dla dzwonka o {format_time(bell_minute)} (spóźnienie {lateness:.1f}s).")
+        self.timeTo[kind] = True
+        self.firedEvents.append((kind, event_time, now))
+        logger.info(f"Akcja: {kind} dla dzwonka o {format_time(bell_minute)}")
 
-            # Znajdź następne zdarzenie (dzwonek)
-            if bell_time > now and not found_next_occurrence:
-                self.nextOccurrence = "Następny dzwonek o " + bell_time.strftime("%H:%M")
-                found_next_occurrence = True
-            
-        if not found_next_occurrence and active_bells:
-            # Jeśli nie znaleziono przyszłego dzwonka dzisiaj, znajdź pierwszy jutro
-            # Dźwięki przeszły już dzisiaj, więc następny jest jutro
-            next_day_bell = min(active_bells, key=lambda x: x[0]) # Znajdź najwcześniejszy dzwonek
-            self.nextOccurrence = "Następny dzwonek o " + (next_day_bell[0] + timedelta(days=1)).strftime("%H:%M")
-        elif not active_bells:
-            self.nextOccurrence = "Brak aktywnych dzwonków"
-        # else: nextOccurrence zostało już ustawione przez `found_next_occurrence` lub domyślnie
+    def getNextEventTime(self, now=None):
+        """
+        Zwraca czas (datetime) najbliższego zdarzenia z osi czasu po bieżącej sekundzie.
+        Zdarzenia pomijane w weekend nie są brane pod uwagę. Jeśli dziś nie ma już zdarzeń, zwraca
+        północ - wtedy harmonogram trzeba sprawdzić ponownie dla nowej doby.
+        """
+        if now is None:
+            now = self.clock.now()
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        timeline, day = self._timeline, now.date()
+        next_second = timeline.nextEventSecond(now.hour * 3600 + now.minute * 60 + now.second,
+                                               lambda i: self._isSuppressed(timeline, i, day))
+        if next_second is None:
+            return midnight + timedelta(days=1)
+        return midnight + timedelta(seconds=next_second)
+
+    def updateBell(self, index, minute_of_day, prebell_seconds, active):
+        """
+        Aktualizuje dane dzwonka o podanym indeksie i kompiluje ponownie oś czasu.
+        Harmonogram pozostaje posortowany - zwraca nowy indeks dzwonka (lub None dla nieprawidłowego indeksu).
+        """
+        if not (0 <= index < len(self.bells)):
+            logger.warning(f"Próba edycji dzwonka o nieprawidłowym indeksie: {index}")
+            return None
+        bell = self.bells[index]
+        if (bell.minute, bell.prebellSeconds, bell.active) == (minute_of_day, prebell_seconds, bool(active)):
+            return index # Bez zmian - nie kompiluj ponownie
+        new_index = self.bells.updateSorted(index, minute_of_day, prebell_seconds, active)
+        self._compileTimeline()
+        return new_index
 
-    def saveScheduleToJson(self):
-        """Zapisuje harmonogram do pliku JSON."""
+    def setNoWeekend(self, no_weekend):
+        """Włącza lub wyłącza dzwonki w weekend, powiadamia obserwatorów (przeplanowanie timera) i zapisuje zmianę."""
+        no_weekend = bool(no_weekend)
+        if no_weekend == self.noWeekend:
+            return
+        self.noWeekend = no_weekend
+        self.version += 1
+        for listener in self._listeners:
+            listener()
+        self.saveScheduleToJson()
+
+    def saveScheduleToJson(self, callback=None, wait=False):
+        """
+        Zleca zapis harmonogramu do pliku JSON. Zapis wykonuje wątek zapisujący, łącząc serię
+        zmian w jeden zapis. `callback(error)` jest wywoływany w tym wątku po zapisie (error=None - sukces).
+        `wait=True` zapisuje natychmiast i czeka na zakończenie (np. przy zamykaniu aplikacji).
+        """
+        bell_schedule, prebell_intervals, bell_active = self.bells.toJson()
         data_to_save = {
-            'bell_schedule': self.data["bellSchedule"],
-            'pre_bell_intervals': self.data["prebellIntervals"],
-            'pre_bell_active': self.data["bellActive"],
+            'bell_schedule': bell_schedule,
+            'pre_bell_intervals': prebell_intervals,
+            'pre_bell_active': bell_active,
             'no_weekend': self.noWeekend
         }
-        try:
-            with open(self.__scheduleLocation, 'w') as f:
-                json.dump(data_to_save, f, indent=4)
-            logger.info(f"Harmonogram zapisany do: {self.__scheduleLocation}")
-        except IOError as e:
-            logger.error(f"Błąd zapisu pliku {self.__scheduleLocation}: {e}")
+        if self.maxBells != constants.MAX_BELLS:
+            data_to_save['max_bells'] = self.maxBells
+        self._writer.request(data_to_save, callback)
+        if wait and not self._writer.flush():
+            logger.error(f"Przekroczono czas oczekiwania na zapis pliku {self.__scheduleLocation}")
 
     def addSchedule(self):
-        """Dodaje nowy dzwonek do harmonogramu."""
-        from constants import MAX_BELLS, DEFAULT_BELL_INTERVAL # Importuj stałe
-        if len(self.data['bellSchedule']) >= MAX_BELLS:
-            logger.warning(f"Osiągnięto maksymalną liczbę dzwonków ({MAX_BELLS}). Nie można dodać więcej.")
-            return False # Sygnalizuj, że dodanie się nie powiodło
+        """Dodaje nowy dzwonek do harmonogramu. Zwraca indeks nowego dzwonka lub None, jeśli osiągnięto limit."""
+        from constants import DEFAULT_BELL_INTERVAL # Importuj stałe
+        if len(self.bells) >= self.maxBells:
+            logger.warning(f"Osiągnięto maksymalną liczbę dzwonków ({self.maxBells}). Nie można dodać więcej.")
+            return None # Sygnalizuj, że dodanie się nie powiodło
 
         #default_time = datetime.now().strftime("%H:%M")
-        self.data["bellSchedule"].append("06:00")
-        self.data["prebellIntervals"].append(DEFAULT_BELL_INTERVAL)
-        self.data["bellActive"].append(True)
+        index = self.bells.insertSorted(6 * 60, int(round(DEFAULT_BELL_INTERVAL * 60)), True) # 06:00
 
-        self._sort_schedule()
+        self._compileTimeline()
         self.saveScheduleToJson()
         logger.info(f"Dodano nowy dzwonek")
-        return True # Sygnalizuj sukces
+        return index
 
     def deleteSchedule(self, index):
         """Usuwa dzwonek o podanym indeksie z harmonogramu."""
-        if 0 <= index < len(self.data["bellSchedule"]):
-            deleted_time = self.data["bellSchedule"][index]
-            del self.data["bellSchedule"][index]
-            del self.data["prebellIntervals"][index]
-            del self.data["bellActive"][index]
-            self._sort_schedule()
+        if 0 <= index < len(self.bells):
+            deleted_time = self.bells[index].time
+            self.bells.delete(index) # Usunięcie nie zmienia kolejności pozostałych dzwonków
+            self._compileTimeline()
             self.saveScheduleToJson()
             logger.info(f"Usunięto dzwonek: {deleted_time} (indeks: {index})")
             return True
@@ -185,27 +358,47 @@ class scheduleHandling:
             return False
 
     def _sort_schedule(self):
-        """Sortuje harmonogram po czasie dzwonka."""
-        if not self.data["bellSchedule"]: # Zabezpieczenie przed pustą listą
-            return
-        
-        sorted_data = sorted(zip(self.data["bellSchedule"], self.data["prebellIntervals"], self.data["bellActive"]),
-                            key=lambda x: datetime.strptime(x[0], "%H:%M"))
-        
-        self.data["bellSchedule"], self.data["prebellIntervals"], self.data["bellActive"] = (
-            list(t) for t in zip(*sorted_data)
-        )
+        """Sortuje harmonogram po czasie dzwonka (tylko po wczytaniu z pliku - edycje zachowują kolejność)."""
+        self.bells.sort()
 
     def getFormattedScheduleList(self):
-        """Zwraca sformatowaną listę dzwonków."""
-        self._sort_schedule()
+        """Zwraca sformatowaną listę dzwonków (zapamiętaną do następnej zmiany harmonogramu)."""
+        cache = self._formattedCache
+        if cache is not None and cache[0] == self.version:
+            return cache[1]
+        formatted_list = self._format_schedule_list()
+        self._formattedCache = (self.version, formatted_list)
+        return formatted_list
+
+    def _format_schedule_list(self):
         formatted_list = []
-        if not self.data["bellSchedule"]:
+        if not self.bells:
             return ["Brak zdefiniowanych dzwonków"]
 
-        for i, time_str in enumerate(self.data["bellSchedule"]):
-            status = "✔  - " if self.data["bellActive"][i] else "✖  - "
+        for i, bell in enumerate(self.bells):
+            status = "✔  - " if bell.active else "✖  - "
             
-#            status = "✔         Aktywny -" if self.data["bellActive"][i] else "✖   Nieaktywny -"
-            formatted_list.append(f"{status} Dzwonek {i + 1:02}  -  {time_str}")
+#            status = "✔         Aktywny -" if bell.active else "✖   Nieaktywny -"
+            formatted_list.append(f"{status} Dzwonek {i + 1:02}  -  {bell.time}")
         return formatted_list
+
+
+def _parse_schedule_data(raw):
+    """
+    Sprawdza i zamienia dane harmonogramu w formacie pliku JSON na tabelę dzwonków.
+    Zwraca (BellTable, noWeekend, limit dzwonków) lub zgłasza ValueError z opisem błędu.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("oczekiwano obiektu JSON")
+    no_weekend = raw.get('no_weekend', True)
+    if not isinstance(no_weekend, bool):
+        raise ValueError(f"nieprawidłowa wartość no_weekend: {no_weekend!r}")
+    max_bells = raw.get('max_bells', constants.MAX_BELLS)
+    if isinstance(max_bells, bool) or not isinstance(max_bells, int) or not (1 <= max_bells <= constants.MAX_BELLS_LIMIT):
+        raise ValueError(f"nieprawidłowa wartość max_bells: {max_bells!r} (dozwolone 1..{constants.MAX_BELLS_LIMIT})")
+    bell_schedule = raw.get('bell_schedule', [])
+    # Sprawdzane przed parsowaniem, aby czas wczytania pliku był ograniczony
+    if isinstance(bell_schedule, list) and len(bell_schedule) > constants.MAX_BELLS_LIMIT:
+        raise ValueError(f"za dużo dzwonków: {len(bell_schedule)} (maksymalnie {constants.MAX_BELLS_LIMIT})")
+    bells = BellTable.fromJson(bell_schedule, raw.get('pre_bell_intervals', []), raw.get('pre_bell_active', []))
+    return bells, no_weekend, max_bells
@@ -0,0 +1,173 @@
+from collections import namedtuple
+import os
+import queue
+import threading
+import logging
+
+from constants import SCHEDULER_MODE, MAX_SCHEDULER_SLEEP_SECONDS, SCHEDULER_THREAD_NICE
+from timingStats import TimingStats
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Tolerancja wczesnego wybudzenia (sekundy)
+_EARLY_WAKE_TOLERANCE = 0.002
+
+# Niezmienny stan planisty udostępniany GUI
+SchedulerSnapshot = namedtuple("SchedulerSnapshot", ["nextOccurrence", "nextEventTime", "eventStats"])
+
+
+class BellScheduler:
+    """
+    Planista dzwonków: wywołuje scheduleHandling.checkSchedule() i wykonuje akcje
+    (wzmacniacz, przeddzwonek, dzwonek) na podstawie flag `timeTo`.
+
+    Działa we własnym wątku o podwyższonym priorytecie, niezależnie od pętli Tk -
+    zawieszenie GUI (popup, przerysowanie ekranu) nie opóźnia dzwonka. Z GUI komunikuje się
+    wyłącznie przez niezmienną migawkę stanu (snapshot()) i kolejkę zdarzeń (events).
+
+    W trybie "deadline" nie odpytuje harmonogramu co sekundę - wylicza czas najbliższego
+    zdarzenia i czeka dokładnie do tego momentu. Termin jest pilnowany zegarem monotonicznym,
+    więc wczesne wybudzenie jest korygowane. W trybie "poll" sprawdza harmonogram co sekundę.
+    """
+    def __init__(self, schedule, music, mode=SCHEDULER_MODE, timing=None, on_first_tick=None):
+        self.schedule = schedule
+        self.music = music
+        self.clock = schedule.clock  # Ten sam zegar co harmonogram (VirtualClock w symulacji)
+        self.mode = mode
+        self.timing = timing if timing is not None else TimingStats(clock=self.clock)  # Pomiary opóźnień dzwonków
+        self.events = queue.Queue(maxsize=100)  # Zdarzenia dla GUI: (typ, wartość) - przeładowanie harmonogramu z pliku
+
+        self._deadline_monotonic = None  # Termin kolejnego zdarzenia na zegarze monotonicznym
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._snapshot = SchedulerSnapshot(schedule.nextOccurrence, None, dict(schedule.eventStats))
+        self._on_first_tick = on_first_tick  # Wywoływana raz, po pierwszym ticku wątku planisty (pomiar startu)
+
+        self.schedule.addListener(self.reschedule)
+
+    def start(self):
+        """Uruchamia wątek planisty."""
+        self._thread = threading.Thread(target=self._run, name="BellScheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Uruchomiono planistę dzwonków w trybie '{self.mode}'.")
+
+    def stop(self):
+        """Zatrzymuje wątek planisty."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.timing.save()
+
+    def reschedule(self):
+        """
+        Wylicza termin od nowa, np. po edycji harmonogramu lub zmianie zegara systemowego.
+        Może być wywołana z dowolnego wątku.
+        """
+        self._deadline_monotonic = None
+        self._wake.set()
+
+    def snapshot(self):
+        """Zwraca niezmienną migawkę stanu planisty (bezpieczne z dowolnego wątku)."""
+        return self._snapshot
+
+    def _run(self):
+        self._raise_priority()
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                delay = self.tick()
+            except Exception as e:
+                logger.error(f"Błąd planisty dzwonków: {e}")
+                delay = 1.0
+            if self._on_first_tick is not None:
+                callback, self._on_first_tick = self._on_first_tick, None
+                callback()
+            self._wake.wait(delay)
+
+    def _raise_priority(self):
+        """Podnosi priorytet wątku planisty (Linux, wymaga uprawnień roota)."""
+        if not hasattr(os, "setpriority"):
+            return
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), SCHEDULER_THREAD_NICE)
+            logger.info(f"Ustawiono priorytet wątku planisty: nice {SCHEDULER_THREAD_NICE}.")
+        except OSError as e:
+            logger.warning(f"Nie udało się podnieść priorytetu wątku planisty: {e}")
+
+    def tick(self):
+        """
+        Jedno wybudzenie planisty. Zwraca liczbę sekund do kolejnego wybudzenia.
+        """
+        if self.schedule.applyPendingReload():
+            self._deadline_monotonic = None
+            self._publish("scheduleReloaded", None)
+
+        if self.mode == "poll":
+            self._check_and_dispatch()
+            return 1.0
+
+        # Wybudzenie przed terminem - dośpij brakujący czas
+        if self._deadline_monotonic is not None:
+            remaining = self._deadline_monotonic - self.clock.monotonic()
+            if remaining > _EARLY_WAKE_TOLERANCE:
+                return remaining
+
+        next_event_time = self._check_and_dispatch()
+        delay = (next_event_time - self.clock.now()).total_seconds()
+        # Ograniczenie snu pozwala wychwycić zmiany zegara systemowego
+        delay = min(max(delay, 0.0), MAX_SCHEDULER_SLEEP_SECONDS)
+        self._deadline_monotonic = self.clock.monotonic() + delay
+        logger.debug(f"Następne wybudzenie planisty za {delay:.3f}s.")
+        return delay
+
+    def _check_and_dispatch(self):
+        """Sprawdza harmonogram, wykonuje akcje i publikuje nową migawkę stanu."""
+        self.schedule.checkSchedule()
+        self._dispatch()
+
+        next_event_time = self.schedule.getNextEventTime()
+        self._snapshot = SchedulerSnapshot(self.schedule.nextOccurrence, next_event_time, dict(self.schedule.eventStats))
+        return next_event_time
+
+    def _publish(self, kind, value):
+        """Wrzuca zdarzenie do kolejki GUI; przy pełnej kolejce (brak odbiorcy) zdarzenie jest pomijane."""
+        try:
+            self.events.put_nowait((kind, value))
+        except queue.Full:
+            pass
+
+    def _dispatch(self):
+        """Wykonuje akcje na podstawie flag `timeTo` ustawionych przez checkSchedule()."""
+        # Ślady czasowe zdarzeń (jeden na typ - kilka zdarzeń tego samego typu daje jedną akcję)
+        traces = {}
+        for kind, scheduled, detected in self.schedule.firedEvents:
+            if kind not in traces:
+                traces[kind] = self.timing.trace(kind, scheduled)
+                traces[kind].mark("detected", detected.timestamp())
+        for trace in traces.values():
+            trace.mark("dispatched")
+
+        # Flagi są resetowane w schedule.checkSchedule(), więc akcja wyzwoli się tylko raz
+        if self.schedule.timeTo["turnAmpOn"]:
+            self.music._amp_relay(state=True, trace=traces.get("turnAmpOn"))
+            logger.info("Włączono wzmacniacz.")
+
+        if self.schedule.timeTo["playPrebell"]:
+            self.music.playPrebell(trace=traces.get("playPrebell"))
+            logger.info("Odtworzono przeddzwonek.")
+
+        if self.schedule.timeTo["playBell"]:
+            self.music.playBell(trace=traces.get("playBell"))
+            logger.info("Odtworzono dzwonek.")
+
+        if self.schedule.timeTo["turnAmpOff"]:
+            self.music._amp_relay(state=False, trace=traces.get("turnAmpOff"))
+            logger.info("Wyłączono wzmacniacz.")
+
+        # Ślady przełączenia wzmacniacza są kompletne od razu; ślady dźwięków kończy wątek audio
+        for kind in ("turnAmpOn", "turnAmpOff"):
+            if kind in traces:
+                traces[kind].complete()
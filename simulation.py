@@ -0,0 +1,114 @@
+"""
+Symulacja harmonogramu w czasie wirtualnym.
+
+Planista dzwonków (BellScheduler) jest wywoływany krok po kroku, a zegar wirtualny
+przeskakuje od razu do kolejnego terminu - tydzień czy rok harmonogramu przechodzi w kilka sekund.
+Wynikiem jest lista wszystkich zdarzeń (wzmacniacz, przeddzwonek, dzwonek) z planowanym
+i faktycznym czasem wykonania.
+
+Przykład:
+    python simulation.py --start 2025-09-01 --days 7
+    python simulation.py --schedule Files/schedule.json --days 365 --json trace.json
+"""
+from datetime import datetime, timedelta
+import argparse
+import json
+import os
+import sys
+import logging
+
+from clockHandling import VirtualClock
+from schedule import scheduleHandling
+from scheduler import BellScheduler
+from timingStats import TimingStats
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class SimulatedMusic:
+    """Zastępuje musicHandling w symulacji - zamiast grać, zapisuje zdarzenia w śladzie."""
+    def __init__(self, clock):
+        self.clock = clock
+        self.trace = []  # Lista słowników: kind, scheduled, executed, lateness
+
+    def _record(self, kind, trace):
+        executed = self.clock.now()
+        scheduled = datetime.fromtimestamp(trace.scheduled) if trace is not None else executed
+        self.trace.append({
+            "kind": kind,
+            "scheduled": scheduled,
+            "executed": executed,
+            "lateness": (executed - scheduled).total_seconds(),
+        })
+        if trace is not None:
+            trace.complete()
+
+    def _amp_relay(self, state, trace=None):
+        self._record("turnAmpOn" if state else "turnAmpOff", trace)
+
+    def playBell(self, test=False, trace=None):
+        self._record("playBell", trace)
+
+    def playPrebell(self, test=False, trace=None):
+        self._record("playPrebell", trace)
+
+
+def run_simulation(schedule_path, start, days, mode="deadline", tick_jitter=0.0):
+    """
+    Przechodzi `days` dni harmonogramu od `start` w czasie wirtualnym.
+    `tick_jitter` - dodatkowe opóźnienie (sekundy) każdego wybudzenia planisty, np. do sprawdzenia
+    zachowania przy spóźnieniach. Zwraca (ślad zdarzeń, statystyki spóźnionych/utraconych zdarzeń).
+    """
+    clock = VirtualClock(start)
+    schedule = scheduleHandling(schedule_path, clock=clock)
+    music = SimulatedMusic(clock)
+    scheduler = BellScheduler(schedule, music, mode=mode, timing=TimingStats(persist=False, clock=clock))
+    end = start + timedelta(days=days)
+
+    while clock.now() < end:
+        delay = scheduler.tick()
+        remaining = (end - clock.now()).total_seconds()
+        clock.advance(min(delay + tick_jitter, remaining))
+
+    return music.trace, dict(schedule.eventStats)
+
+
+def _format_trace_line(event):
+    executed = event['executed'].strftime("%H:%M:%S.%f")[:-3]
+    return f"{event['scheduled']:%Y-%m-%d %a %H:%M:%S}  {event['kind']:<12}  wykonano {executed}  (+{event['lateness']:.3f}s)"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Symulacja harmonogramu dzwonków w czasie wirtualnym")
+    parser.add_argument("--schedule", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "Files/schedule.json"),
+                        help="plik harmonogramu JSON")
+    parser.add_argument("--start", default=None, help="początek symulacji, RRRR-MM-DD (domyślnie dziś)")
+    parser.add_argument("--days", type=float, default=7, help="liczba dni do przejścia")
+    parser.add_argument("--mode", choices=("deadline", "poll"), default="deadline", help="tryb planisty")
+    parser.add_argument("--jitter", type=float, default=0.0, help="opóźnienie każdego wybudzenia planisty (sekundy)")
+    parser.add_argument("--json", metavar="PLIK", help="zapisz ślad zdarzeń do pliku JSON zamiast wypisywać")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    logging.disable(logging.INFO) # Moduły ustawiają poziom INFO - w symulacji tylko ostrzeżenia i błędy
+    if not os.path.exists(args.schedule):
+        print(f"Plik harmonogramu nie istnieje: {args.schedule}", file=sys.stderr)
+        sys.exit(1)
+    start = datetime.strptime(args.start, "%Y-%m-%d") if args.start else datetime.combine(datetime.now().date(), datetime.min.time())
+
+    trace, stats = run_simulation(args.schedule, start, args.days, args.mode, args.jitter)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"events": trace, "eventStats": stats}, f, indent=2, default=str)
+    else:
+        for event in trace:
+            print(_format_trace_line(event))
+    counts = {}
+    for event in trace:
+        counts[event["kind"]] = counts.get(event["kind"], 0) + 1
+    print(f"Zdarzenia: {counts}, spóźnione: {stats['late']}, utracone: {stats['missed']}", file=sys.stderr)
@@ -0,0 +1,165 @@
+from collections import OrderedDict
+import os
+import queue
+import threading
+import time
+import logging
+
+import pygame
+
+from constants import SOUND_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class SoundCache:
+    """
+    Pamięć podręczna zdekodowanych dźwięków (pygame.mixer.Sound, bufory PCM w RAM).
+    Pliki dzwonka, przeddzwonka i alarmu są dekodowane z wyprzedzeniem, więc w chwili
+    dzwonienia odtwarzanie to tylko start kanału na gotowym buforze - bez otwierania
+    i dekodowania MP3 z pendrive'a.
+
+    get() nigdy nie dekoduje w wątku wywołującym: przy braku wpisu zwraca None (odtwarzanie
+    strumieniowe) i zleca dekodowanie w tle. `max_seconds` ogranicza bufor do początku pliku
+    (dzwonek i przeddzwonek grają najwyżej MAX_MUSIC_LEN sekund, a bywają całymi utworami).
+
+    Wpis jest unieważniany, gdy zmieni się ścieżka, czas modyfikacji lub rozmiar pliku.
+    Łączny rozmiar buforów jest ograniczony budżetem `max_bytes` (najdawniej używane są usuwane,
+    z wyjątkiem plików przekazanych ostatnio do preload() - te nie usuwają się nawzajem).
+    """
+    def __init__(self, max_bytes=SOUND_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (ścieżka, max_seconds) -> (klucz, Sound, rozmiar w bajtach)
+        self._rejected = {}            # (ścieżka, max_seconds) -> klucz pliku, którego nie da się/nie warto buforować
+        self._pinned = set()           # Wpisy z ostatniego preload() - nie są usuwane przy zwalnianiu budżetu
+        self._queued = set()           # Wpisy czekające na dekodowanie w tle
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._worker = None
+
+    @staticmethod
+    def _file_key(path):
+        st = os.stat(path)
+        return (path, st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _pcm_size(sound):
+        """Szacuje rozmiar bufora PCM na podstawie długości i formatu miksera."""
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency * channels * (abs(sample_format) // 8))
+
+    def _lookup(self, entry_id):
+        """Zwraca (dźwięk, klucz pliku, czy dekodować) dla wpisu - bez dekodowania."""
+        try:
+            key = self._file_key(entry_id[0])
+        except OSError:
+            return None, None, False
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(entry_id)
+                return entry[1], key, False
+            return None, key, self._rejected.get(entry_id) != key
+
+    def get(self, path, max_seconds=None):
+        """
+        Zwraca zdekodowany dźwięk dla pliku lub None - wtedy należy odtwarzać strumieniowo
+        przez pygame.mixer.music. Brakujący wpis jest dekodowany w tle (na następny raz).
+        """
+        if not path:
+            return None
+        entry_id = (path, max_seconds)
+        sound, key, load = self._lookup(entry_id)
+        if load:
+            self._request(entry_id)
+        return sound
+
+    def preload(self, items):
+        """
+        Dekoduje podane pliki (lista (ścieżka, max_seconds)) w wątku wywołującym - pomija te,
+        które są już aktualne w pamięci. Wpisy te nie są usuwane przy dekodowaniu kolejnych plików.
+        """
+        entries = [(path, max_seconds) for path, max_seconds in items if path]
+        with self._lock:
+            self._pinned = set(entries)
+        for entry_id in entries:
+            sound, key, load = self._lookup(entry_id)
+            if load:
+                self._load(entry_id, key)
+
+    def invalidate(self, path=None):
+        """Usuwa wpisy dla pliku (lub wszystkie wpisy)."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._rejected.clear()
+                self._total_bytes = 0
+            else:
+                for entry_id in [entry_id for entry_id in self._entries if entry_id[0] == path]:
+                    self._total_bytes -= self._entries.pop(entry_id)[2]
+                for entry_id in [entry_id for entry_id in self._rejected if entry_id[0] == path]:
+                    del self._rejected[entry_id]
+
+    def _request(self, entry_id):
+        """Zleca dekodowanie wpisu wątkowi w tle (jeden wątek, kolejne zlecenia tego samego pliku są łączone)."""
+        with self._lock:
+            if entry_id in self._queued:
+                return
+            self._queued.add(entry_id)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._decode_worker, name="SoundDecoder", daemon=True)
+                self._worker.start()
+        self._requests.put(entry_id)
+
+    def _decode_worker(self):
+        while True:
+            entry_id = self._requests.get()
+            try:
+                sound, key, load = self._lookup(entry_id)
+                if load:
+                    self._load(entry_id, key)
+            except Exception as e:
+                logger.error(f"Błąd dekodowania pliku {entry_id[0]}: {e}")
+            finally:
+                with self._lock:
+                    self._queued.discard(entry_id)
+
+    def _load(self, entry_id, key):
+        path, max_seconds = entry_id
+        start = time.perf_counter()
+        try:
+            sound = pygame.mixer.Sound(path)
+            if max_seconds is not None and sound.get_length() > max_seconds:
+                # Zachowaj tylko początek - reszta pliku i tak nie zostanie odtworzona
+                frequency, sample_format, channels = pygame.mixer.get_init()
+                frame_bytes = channels * (abs(sample_format) // 8)
+                sound = pygame.mixer.Sound(buffer=sound.get_raw()[:int(max_seconds * frequency) * frame_bytes])
+        except Exception as e:
+            logger.warning(f"Nie udało się zdekodować pliku {path} do pamięci, odtwarzanie strumieniowe: {e}")
+            with self._lock:
+                self._rejected[entry_id] = key
+            return None
+
+        size = self._pcm_size(sound)
+        with self._lock:
+            old = self._entries.pop(entry_id, None)
+            if old is not None:
+                self._total_bytes -= old[2]
+            # Zwolnij najdawniej używane bufory (poza przypiętymi), aby zmieścić się w budżecie
+            for evicted_id in [other for other in self._entries if other not in self._pinned]:
+                if self._total_bytes + size <= self.max_bytes:
+                    break
+                self._total_bytes -= self._entries.pop(evicted_id)[2]
+                logger.info(f"Usunięto z pamięci dźwięk: {os.path.basename(evicted_id[0])}")
+            if self._total_bytes + size > self.max_bytes:
+                logger.warning(f"Plik {os.path.basename(path)} po zdekodowaniu ({size / 1048576:.1f} MB) nie mieści się w budżecie pamięci, odtwarzanie strumieniowe.")
+                self._rejected[entry_id] = key
+                return None
+            self._entries[entry_id] = (key, sound, size)
+            self._total_bytes += size
+            self._rejected.pop(entry_id, None)
+
+        logger.info(f"Zdekodowano do pamięci: {os.path.basename(path)} ({size / 1048576:.1f} MB, {(time.perf_counter() - start) * 1000:.0f} ms)")
+        return sound
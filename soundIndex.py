@@ -0,0 +1,68 @@
+from collections import namedtuple
+import os
+import threading
+import logging
+
+from constants import SOUND_INDEX_POLL_SECONDS
+from fileWatch import PathWatcher
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Niezmienny wynik indeksowania: pełne ścieżki plików dla każdej roli (lub None)
+SoundFiles = namedtuple("SoundFiles", ["bell", "prebell", "alarm"])
+
+# Pierwszy znak nazwy pliku MP3 -> rola
+_PREFIX_ROLES = {"1": "bell", "2": "prebell", "0": "alarm"}
+
+
+class SoundFileIndexer:
+    """
+    Wyszukuje pliki dźwiękowe (dzwonek "1...", przeddzwonek "2...", alarm "0...")
+    jednym przejściem drzewa katalogów, a potem ponawia je tylko po zmianie
+    (inotify, montowanie nośnika lub - awaryjnie - zmiana mtime katalogów).
+
+    Wynik (SoundFiles) jest publikowany atomowo przez `on_change(files)`.
+    """
+    def __init__(self, root, default_path, on_change):
+        self.root = root
+        self.default_path = default_path
+        self.on_change = on_change
+        self.files = SoundFiles(None, None, None)
+        self._lock = threading.Lock()
+        self._watcher = PathWatcher(self.rescan, SOUND_INDEX_POLL_SECONDS, name="SoundFileIndexer")
+
+    def start(self):
+        """
+        Uruchamia obserwację zmian. Pierwsze indeksowanie (wraz z metadanymi i dekodowaniem
+        plików w on_change) wykonuje wątek obserwatora - start aplikacji na nie nie czeka.
+        """
+        self._watcher.start(initial_callback=True)
+
+    def stop(self):
+        self._watcher.stop()
+
+    def rescan(self):
+        """Przechodzi drzewo katalogów raz, rozwiązując wszystkie trzy role."""
+        with self._lock:
+            found = {}
+            directories = {self.root}
+            for root, dirs, files in os.walk(self.root):
+                directories.add(root)
+                for filename in sorted(files):
+                    role = _PREFIX_ROLES.get(filename[:1])
+                    if role and role not in found and filename.lower().endswith(".mp3"):
+                        found[role] = os.path.join(root, filename)
+
+            default = self.default_path if os.path.exists(self.default_path) else None
+            if default is None:
+                logger.error(f"Domyślny plik dźwiękowy nie istnieje: {self.default_path}")
+            files = SoundFiles(**{role: found.get(role, default) for role in _PREFIX_ROLES.values()})
+
+            self._watcher.watch(directories)
+            for role, path in files._asdict().items():
+                if path != getattr(self.files, role):
+                    logger.info(f"Znaleziono plik dla '{role}': {path}")
+            self.files = files
+            # Wywoływane także bez zmiany ścieżek - plik mógł zostać nadpisany nową zawartością
+            self.on_change(files)
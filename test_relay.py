@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from relay import RecorderBackend, RelayDriver
+
+AMP_PIN = 12
+
+
+def test_driver_writes_only_state_changes():
+    backend = RecorderBackend()
+    relay = RelayDriver(AMP_PIN, backend)
+    # amp-on, dzwonek i przeddzwonek (każdy włącza wzmacniacz przed graniem), amp-off
+    for state in (True, True, True, False):
+        relay.set(state)
+    assert backend.setups == [AMP_PIN]
+    assert backend.writes == [(AMP_PIN, True), (AMP_PIN, False)]
+    assert (relay.writes, relay.skipped) == (2, 2)
+
+
+def test_music_sequence_skips_redundant_relay_writes():
+    pygame = pytest.importorskip("pygame")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from music import musicHandling
+    from soundIndex import SoundFiles
+
+    backend = RecorderBackend()
+    music = musicHandling(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Files"), AMP_PIN, relay=RelayDriver(AMP_PIN, backend))
+    sample = music._sampleSoundLocation
+    music.soundFiles.set(SoundFiles(sample, sample, sample))
+
+    music._amp_relay(state=True)
+    music._start_clip("bell")
+    music._start_clip("prebell")
+    music._amp_relay(state=False)
+
+    assert backend.writes == [(AMP_PIN, True), (AMP_PIN, False)]
+    assert (music.relay.writes, music.relay.skipped) == (2, 2)
+    pygame.mixer.quit()
@@ -0,0 +1,96 @@
+import json
+import os
+import shutil
+from datetime import datetime
+
+import pytest
+
+from bellTable import BellTable
+from clockHandling import VirtualClock
+from schedule import scheduleHandling
+
+SAMPLE_SCHEDULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Files/schedule.json")
+
+
+def _schedule(tmp_path):
+    path = str(tmp_path / "schedule.json")
+    shutil.copy(SAMPLE_SCHEDULE, path)
+    return scheduleHandling(path, clock=VirtualClock(datetime(2025, 9, 1, 7, 0))), path
+
+
+def test_start_and_stop_watching(tmp_path):
+    schedule, _ = _schedule(tmp_path)
+    schedule.startWatching()
+    schedule.stopWatching()
+    schedule.stopWatching() # Ponowne wywołanie (np. przy zamykaniu) nie może zgłosić błędu
+    assert schedule._watcher is None
+
+
+def test_shutdown_sequence_flushes_pending_save(tmp_path):
+    schedule, path = _schedule(tmp_path)
+    schedule.startWatching()
+    schedule.addSchedule()
+    schedule.stopWatching()
+    schedule.saveScheduleToJson(wait=True)
+    reloaded = scheduleHandling(path, clock=schedule.clock)
+    assert len(reloaded.bells) == len(schedule.bells)
+
+
+def _write(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def test_schema_invalid_file_falls_back_to_backup(tmp_path):
+    schedule, path = _schedule(tmp_path)
+    good_bells = len(schedule.bells)
+    schedule.saveScheduleToJson(wait=True) # Kopia .bak z poprawnym harmonogramem
+    _write(path, {"bell_schedule": ["25:00"], "pre_bell_intervals": [0], "pre_bell_active": [True]})
+
+    reloaded = scheduleHandling(path, clock=schedule.clock)
+    assert len(reloaded.bells) == good_bells
+
+    # Zapis nie może przenieść nieprawidłowego pliku na miejsce dobrej kopii
+    reloaded.saveScheduleToJson(wait=True)
+    _write(path, {"bell_schedule": ["25:00"], "pre_bell_intervals": [0], "pre_bell_active": [True]})
+    reloaded.saveScheduleToJson(wait=True)
+    with open(path + ".bak") as f:
+        assert len(json.load(f)["bell_schedule"]) == good_bells
+
+
+@pytest.mark.parametrize("interval", [1e300, float("inf"), float("nan"), 24 * 60, -1])
+def test_out_of_range_prebell_interval_is_rejected(interval):
+    with pytest.raises(ValueError):
+        BellTable.fromJson(["08:00"], [interval], [True])
+
+
+def test_weekend_toggle_notifies_listeners(tmp_path):
+    schedule, path = _schedule(tmp_path)
+    calls = []
+    schedule.addListener(lambda: calls.append(schedule.noWeekend))
+    schedule.setNoWeekend(not schedule.noWeekend)
+    schedule.setNoWeekend(schedule.noWeekend) # Bez zmian - bez powiadomienia
+    assert calls == [schedule.noWeekend]
+    schedule.saveScheduleToJson(wait=True)
+    with open(path) as f:
+        assert json.load(f)["no_weekend"] == schedule.noWeekend
+
+
+def test_editing_bell_to_just_passed_time_does_not_ring(tmp_path):
+    path = str(tmp_path / "schedule.json")
+    _write(path, {"bell_schedule": ["08:30", "09:00"], "pre_bell_intervals": [0, 0], "pre_bell_active": [True, True]})
+    clock = VirtualClock(datetime(2025, 9, 1, 7, 58, 45))
+    schedule = scheduleHandling(path, clock=clock)
+    clock.advance(25) # 07:59:10
+    schedule.updateBell(0, 7 * 60 + 59, 0, True)
+    schedule.checkSchedule()
+    assert not any(schedule.timeTo.values())
+    assert schedule.eventStats == {"late": 0, "missed": 0}
+
+    # Zdarzenia obecne także przed edycją są nadrabiane jak dotychczas
+    clock.advance(60 * 60) # 08:59:10
+    schedule.checkSchedule()
+    schedule.updateBell(0, 10 * 60, 0, True)
+    clock.advance(60) # 09:00:10
+    schedule.checkSchedule()
+    assert schedule.timeTo["playBell"]
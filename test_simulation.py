@@ -0,0 +1,33 @@
+import json
+from datetime import datetime
+
+from simulation import run_simulation
+
+
+def test_weekend_bell_after_midnight_does_not_leave_amp_on(tmp_path):
+    path = str(tmp_path / "schedule.json")
+    with open(path, "w") as f:
+        json.dump({"bell_schedule": ["00:00", "08:00"], "pre_bell_intervals": [1, 0],
+                   "pre_bell_active": [True, True], "no_weekend": True}, f)
+
+    trace, stats = run_simulation(path, datetime(2025, 9, 5, 12, 0), days=4) # Od piątku w południe
+    fired = [(event["scheduled"], event["kind"]) for event in trace]
+
+    # Przeddzwonek i wzmacniacz dla sobotniego dzwonka o 00:00 nie są wyzwalane w piątek wieczorem
+    assert (datetime(2025, 9, 5, 23, 58, 50), "turnAmpOn") not in fired
+    assert (datetime(2025, 9, 5, 23, 59), "playPrebell") not in fired
+    # Dzwonek o 00:00 w poniedziałek - przeddzwonek i wzmacniacz w niedzielę wieczorem
+    assert (datetime(2025, 9, 7, 23, 58, 50), "turnAmpOn") in fired
+    assert (datetime(2025, 9, 7, 23, 59), "playPrebell") in fired
+    assert (datetime(2025, 9, 8, 0, 0), "playBell") in fired
+
+    # Po każdym włączeniu wzmacniacz jest wyłączany w ciągu dwóch minut
+    amp_on = None
+    for scheduled, kind in fired:
+        if kind == "turnAmpOn":
+            amp_on = scheduled
+        elif kind == "turnAmpOff" and amp_on is not None:
+            assert (scheduled - amp_on).total_seconds() < 120
+            amp_on = None
+    assert amp_on is None or amp_on == datetime(2025, 9, 8, 23, 58, 50)
+    assert stats == {"late": 0, "missed": 0}
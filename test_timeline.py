@@ -0,0 +1,29 @@
+from bellTable import BellTable
+from timeline import compileTimeline, TURN_AMP_ON, TURN_AMP_OFF
+
+
+def _amp_events(spec):
+    bells = BellTable()
+    for minute, prebell_seconds in spec:
+        bells.append(minute, prebell_seconds, True)
+    timeline = compileTimeline(bells)
+    return [(second, kind, minute) for second, kind, minute in zip(timeline.times, timeline.kinds, timeline.bellMinutes)
+            if kind in (TURN_AMP_ON, TURN_AMP_OFF)]
+
+
+def test_amp_windows_merge_across_midnight():
+    # Dzwonek o 23:58 i przeddzwonek (2 min) dzwonka o 00:00 - jedno włączenie wzmacniacza
+    events = _amp_events([(23 * 60 + 58, 0), (0, 120)])
+    assert [kind for _, kind, _ in events] == [TURN_AMP_OFF, TURN_AMP_ON]
+    assert events[1][2] == 23 * 60 + 58 and events[0][2] == 0
+
+
+def test_distant_amp_windows_are_not_merged():
+    events = _amp_events([(8 * 60, 0), (12 * 60, 0)])
+    assert [kind for _, kind, _ in events] == [TURN_AMP_ON, TURN_AMP_OFF, TURN_AMP_ON, TURN_AMP_OFF]
+
+
+def test_amp_window_covering_whole_day_stays_on():
+    # Dzwonek co minutę - przerwa między końcem a początkiem okna (30 s) mieści się w AMP_MERGE_GAP_SECONDS
+    events = _amp_events([(minute, 0) for minute in range(24 * 60)])
+    assert [kind for _, kind, _ in events] == [TURN_AMP_ON]
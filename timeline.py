@@ -0,0 +1,158 @@
+from bisect import bisect_right
+import logging
+
+from constants import AMP_ON_LEAD_SECONDS, AMP_OFF_DELAY_SECONDS, AMP_MERGE_GAP_SECONDS
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# Typy zdarzeń - nazwy odpowiadają kluczom słownika scheduleHandling.timeTo
+TURN_AMP_ON = "turnAmpOn"
+PLAY_PREBELL = "playPrebell"
+PLAY_BELL = "playBell"
+TURN_AMP_OFF = "turnAmpOff"
+
+# Kolejność zdarzeń występujących w tej samej sekundzie
+_KIND_ORDER = {TURN_AMP_ON: 0, PLAY_PREBELL: 1, PLAY_BELL: 2, TURN_AMP_OFF: 3}
+
+
+class CompiledTimeline:
+    """
+    Skompilowana, posortowana oś czasu zdarzeń jednego dnia.
+    Każde zdarzenie to (sekunda doby, typ zdarzenia, minuta doby dzwonka, którego dotyczy,
+    przesunięcie doby dzwonka względem doby zdarzenia: -1, 0 lub +1). Przesunięcie jest różne od zera
+    dla zdarzeń zawiniętych przez północ - np. przeddzwonek o 23:59 dzwonka o 00:00 należy do następnej doby.
+    Budowana raz po załadowaniu lub edycji harmonogramu, odczytywana przy każdym ticku.
+    """
+    __slots__ = ("times", "kinds", "bellMinutes", "dayOffsets", "bellTimes")
+
+    def __init__(self, events, bell_minutes):
+        # Identyczne dzwonki (np. kilka wpisów o tej samej godzinie) dają jedno zdarzenie
+        events = sorted(set(events), key=lambda e: (e[0], _KIND_ORDER[e[1]]))
+        self.times = [e[0] for e in events]          # Sekundy doby zdarzeń (posortowane)
+        self.kinds = [e[1] for e in events]          # Typy zdarzeń
+        self.bellMinutes = [e[2] for e in events]    # Minuta doby dzwonka, którego dotyczy zdarzenie
+        self.dayOffsets = [e[3] for e in events]     # Doba dzwonka względem doby zdarzenia (-1, 0, +1)
+        self.bellTimes = sorted(set(m * 60 for m in bell_minutes))  # Sekundy doby aktywnych dzwonków
+
+    def __len__(self):
+        return len(self.times)
+
+    def eventRange(self, start_second, end_second, lo=0):
+        """
+        Zwraca zakres indeksów (lo, hi) zdarzeń z przedziału (start_second, end_second].
+        Granice mogą być ułamkowe. `lo` pozwala zacząć wyszukiwanie od kursora z poprzedniego ticku.
+        """
+        lo = bisect_right(self.times, start_second, lo)
+        hi = bisect_right(self.times, end_second, lo)
+        return lo, hi
+
+    def nextEventSecond(self, second, skip=None):
+        """
+        Zwraca sekundę doby najbliższego zdarzenia po `second` lub None, jeśli dziś nie ma już zdarzeń.
+        `skip(i)` pozwala pominąć zdarzenia, które nie zostaną wyzwolone (np. dzwonki w weekend).
+        """
+        i = bisect_right(self.times, second)
+        if skip is not None:
+            while i < len(self.times) and skip(i):
+                i += 1
+        if i < len(self.times):
+            return self.times[i]
+        return None
+
+    def nextBellSecond(self, second):
+        """Zwraca sekundę doby najbliższego dzwonka po `second` lub None, jeśli dziś już nie ma dzwonków."""
+        i = bisect_right(self.bellTimes, second)
+        if i < len(self.bellTimes):
+            return self.bellTimes[i]
+        return None
+
+    def firstBellSecond(self):
+        """Zwraca sekundę doby najwcześniejszego dzwonka lub None."""
+        return self.bellTimes[0] if self.bellTimes else None
+
+
+def _merge_amp_windows(windows, merge_gap):
+    """
+    Scala okna włączenia wzmacniacza (start, koniec, minuta pierwszego dzwonka, minuta ostatniego dzwonka)
+    nachodzące na siebie lub oddzielone przerwą nie dłuższą niż `merge_gap` sekund.
+    Początki okien są sprowadzane do doby [0, SECONDS_PER_DAY), a koniec może wykraczać poza północ.
+    Oś czasu powtarza się codziennie, więc okno kończące dzień jest scalane także z pierwszym oknem
+    następnej doby (np. dzwonek o 23:58 i przeddzwonek dzwonka o 00:00).
+    Okno scalone samo ze sobą przez północ ma koniec None (wzmacniacz nie jest wyłączany).
+    """
+    merged = []
+    normalized = ((start % SECONDS_PER_DAY, end - start + start % SECONDS_PER_DAY, first_minute, last_minute)
+                  for start, end, first_minute, last_minute in windows)
+    for start, end, first_minute, last_minute in sorted(normalized):
+        if merged and start - merged[-1][1] <= merge_gap:
+            previous = merged[-1]
+            if end >= previous[1]:
+                merged[-1] = (previous[0], end, previous[2], last_minute)
+        else:
+            merged.append((start, end, first_minute, last_minute))
+
+    # Scalanie przez północ: pierwsze okno dnia jako okno następnej doby
+    while len(merged) > 1 and merged[0][0] + SECONDS_PER_DAY - merged[-1][1] <= merge_gap:
+        first_start, first_end, first_first_minute, first_last_minute = merged.pop(0)
+        start, end, first_minute, last_minute = merged[-1]
+        if first_end + SECONDS_PER_DAY >= end:
+            merged[-1] = (start, first_end + SECONDS_PER_DAY, first_minute, first_last_minute)
+
+    # Jedno okno obejmujące całą dobę (np. dzwonek co minutę) - wzmacniacz włączony na stałe, bez wyłączenia
+    if len(merged) == 1 and merged[0][0] + SECONDS_PER_DAY - merged[0][1] <= merge_gap:
+        merged[0] = merged[0][:1] + (None,) + merged[0][2:]
+    return merged
+
+
+def _event(second, kind, bell_minute):
+    """
+    Zdarzenie osi czasu dla sekundy liczonej względem doby dzwonka (może wykraczać poza dobę).
+    Zdarzenia są oddalone od swojego dzwonka o mniej niż dobę, więc dobę dzwonka wyznacza porównanie
+    sekundy zdarzenia po zawinięciu z sekundą dzwonka.
+    """
+    event_second = second % SECONDS_PER_DAY
+    bell_second = bell_minute * 60
+    if kind == TURN_AMP_OFF:
+        day_offset = -1 if bell_second > event_second else 0
+    else:
+        day_offset = 1 if bell_second < event_second else 0
+    return (event_second, kind, bell_minute, day_offset)
+
+
+def compileTimeline(bells, amp_merge_gap=AMP_MERGE_GAP_SECONDS):
+    """
+    Rozwija aktywne dzwonki tabeli (bellTable.BellTable) w typowane zdarzenia
+    (amp-on, przeddzwonek, dzwonek, amp-off) zapisane jako sekundy doby i zwraca posortowaną oś czasu.
+    Okna włączenia wzmacniacza bliskich dzwonków są scalane (patrz `_merge_amp_windows`),
+    aby przekaźnik nie przełączał się między nimi.
+    """
+    events = []
+    bell_minutes = []
+    amp_windows = []
+    for minute_of_day, prebell_seconds, active in zip(bells.minutes, bells.prebellSeconds, bells.activeFlags()):
+        if not active:
+            continue
+
+        bell_second = minute_of_day * 60
+        prebell_second = bell_second - prebell_seconds
+        if prebell_seconds == 0:
+            amp_on_second = bell_second - AMP_ON_LEAD_SECONDS
+        else:
+            amp_on_second = prebell_second - AMP_ON_LEAD_SECONDS
+            events.append(_event(prebell_second, PLAY_PREBELL, minute_of_day))
+        events.append((bell_second, PLAY_BELL, minute_of_day, 0))
+        amp_windows.append((amp_on_second, bell_second + AMP_OFF_DELAY_SECONDS, minute_of_day, minute_of_day))
+        bell_minutes.append(minute_of_day)
+
+    windows = _merge_amp_windows(amp_windows, amp_merge_gap)
+    for amp_on_second, amp_off_second, first_minute, last_minute in windows:
+        events.append(_event(amp_on_second, TURN_AMP_ON, first_minute))
+        if amp_off_second is not None:
+            events.append(_event(amp_off_second, TURN_AMP_OFF, last_minute))
+    if len(windows) < len(amp_windows):
+        logger.info(f"Scalono okna wzmacniacza: {len(amp_windows)} -> {len(windows)}")
+
+    return CompiledTimeline(events, bell_minutes)
@@ -0,0 +1,147 @@
+from collections import deque
+import json
+import os
+import threading
+import time
+import logging
+
+from constants import TIMING_STATS_PATH_LINUX
+from clockHandling import systemClock
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Etapy ścieżki zdarzenia, w kolejności występowania
+STAGES = ("detected", "dispatched", "audio_started", "amp_switched")
+
+# Liczba ostatnich próbek pamiętanych dla każdej pary (typ zdarzenia, etap)
+_MAX_SAMPLES = 1000
+# Minimalny odstęp między zapisami statystyk na kartę SD (sekundy)
+_SAVE_INTERVAL_SECONDS = 60
+
+
+class EventTrace:
+    """
+    Znaczniki czasu jednego zdarzenia harmonogramu na kolejnych etapach ścieżki:
+    wykrycie w checkSchedule, przekazanie do musicHandling, start odtwarzania, przełączenie
+    przekaźnika. Wszystkie znaczniki to czas ścienny (clock.time()), porównywany z
+    zaplanowanym czasem zdarzenia.
+    """
+    __slots__ = ("kind", "scheduled", "stamps", "_sink", "_clock")
+
+    def __init__(self, kind, scheduled, sink, clock=systemClock):
+        self.kind = kind
+        self.scheduled = scheduled
+        self.stamps = {}
+        self._sink = sink
+        self._clock = clock
+
+    def mark(self, stage, timestamp=None):
+        """Zapisuje znacznik czasu etapu (tylko pierwszy dla danego etapu)."""
+        if stage not in self.stamps:
+            self.stamps[stage] = self._clock.time() if timestamp is None else timestamp
+
+    def complete(self):
+        """Kończy śledzenie zdarzenia i przekazuje je do statystyk (tylko raz)."""
+        sink, self._sink = self._sink, None
+        if sink is not None:
+            sink.record(self)
+
+
+class TimingStats:
+    """
+    Histogramy opóźnień (p50/p99/max) od zaplanowanego czasu zdarzenia do każdego etapu,
+    osobno dla każdego typu zdarzenia. Próbki są zapisywane w pliku JSON i ładowane po restarcie
+    (`persist=False` - tylko w pamięci, np. w symulacji).
+    """
+    def __init__(self, path=None, persist=True, clock=None):
+        self.path = path or os.path.join(os.path.dirname(os.path.abspath(__file__)), TIMING_STATS_PATH_LINUX)
+        self.persist = persist
+        self.clock = clock if clock is not None else systemClock
+        self._samples = {}  # (typ, etap) -> deque opóźnień w ms
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self._dirty = False
+        if persist:
+            self._load()
+
+    def trace(self, kind, scheduled):
+        """Tworzy nowy ślad zdarzenia zaplanowanego na `scheduled` (datetime)."""
+        return EventTrace(kind, scheduled.timestamp(), self, self.clock)
+
+    def record(self, trace):
+        """Dodaje opóźnienia wszystkich etapów zdarzenia do histogramów."""
+        with self._lock:
+            for stage, stamp in trace.stamps.items():
+                samples = self._samples.setdefault((trace.kind, stage), deque(maxlen=_MAX_SAMPLES))
+                samples.append((stamp - trace.scheduled) * 1000)
+            self._dirty = True
+        stages = ", ".join(f"{stage} {(stamp - trace.scheduled) * 1000:.1f} ms" for stage, stamp in trace.stamps.items())
+        logger.info(f"Opóźnienia {trace.kind}: {stages}")
+        if self.persist and time.monotonic() - self._last_save > _SAVE_INTERVAL_SECONDS:
+            self._last_save = time.monotonic()
+            # Zapis poza wątkiem dzwonka - nie blokuje planisty ani wątku audio
+            threading.Thread(target=self.save, daemon=True).start()
+
+    @staticmethod
+    def _percentile(sorted_values, fraction):
+        index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+        return sorted_values[index]
+
+    def summary(self):
+        """Zwraca {typ: {etap: {"count", "p50", "p99", "max"}}} (wartości w ms)."""
+        with self._lock:
+            items = [(key, sorted(values)) for key, values in self._samples.items() if values]
+        result = {}
+        for (kind, stage), values in items:
+            result.setdefault(kind, {})[stage] = {
+                "count": len(values),
+                "p50": self._percentile(values, 0.50),
+                "p99": self._percentile(values, 0.99),
+                "max": values[-1],
+            }
+        return result
+
+    def formatSummary(self, kinds=None):
+        """Zwraca czytelne podsumowanie opóźnień (do GUI i logu)."""
+        lines = []
+        for kind, stages in sorted(self.summary().items()):
+            if kinds is not None and kind not in kinds:
+                continue
+            final_stage = "audio_started" if "audio_started" in stages else max(stages, key=STAGES.index)
+            s = stages[final_stage]
+            lines.append(f"{kind}: p50 {s['p50']:.0f} ms, p99 {s['p99']:.0f} ms, max {s['max']:.0f} ms (n={s['count']})")
+        return "\n".join(lines) if lines else "Brak pomiarów opóźnień"
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            for kind, stages in data.get("samples", {}).items():
+                for stage, values in stages.items():
+                    self._samples[(kind, stage)] = deque(values, maxlen=_MAX_SAMPLES)
+        except (IOError, ValueError) as e:
+            logger.error(f"Błąd odczytu statystyk opóźnień {self.path}: {e}")
+
+    def save(self):
+        """Zapisuje próbki i podsumowanie do pliku JSON (jeśli coś się zmieniło)."""
+        with self._lock:
+            if not self.persist or not self._dirty:
+                return
+            samples = {}
+            for (kind, stage), values in self._samples.items():
+                samples.setdefault(kind, {})[stage] = [round(v, 3) for v in values]
+            self._dirty = False
+            self._last_save = time.monotonic()
+        data = {"summary": self.summary(), "samples": samples}
+        tmp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+            logger.info("Statystyki opóźnień dzwonków:\n" + self.formatSummary())
+        except IOError as e:
+            logger.error(f"Błąd zapisu statystyk opóźnień {self.path}: {e}")
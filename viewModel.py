@@ -0,0 +1,52 @@
+import threading
+
+
+class Observable:
+    """
+    Wartość z numerem wersji, zwiększanym tylko przy faktycznej zmianie.
+    Zapisywana z dowolnego wątku (planista, wątek audio, indeksowanie plików),
+    odczytywana w pętli GUI - ramki porównują wersje zamiast przebudowywać widżety co sekundę.
+    """
+    __slots__ = ("_state", "_lock")
+
+    def __init__(self, value=None):
+        self._state = (0, value)  # (wersja, wartość) - podmieniane razem, odczyt jest atomowy
+        self._lock = threading.Lock()
+
+    @property
+    def value(self):
+        return self._state[1]
+
+    @property
+    def version(self):
+        return self._state[0]
+
+    def set(self, value):
+        """Ustawia wartość. Zwraca True, jeśli się zmieniła (i wersja została zwiększona)."""
+        with self._lock:
+            version, current = self._state
+            if current == value:
+                return False
+            self._state = (version + 1, value)
+            return True
+
+
+class RenderGate:
+    """
+    Pamięta wersje obserwowanych wartości z ostatniego odświeżenia widoku.
+    `changed()` zwraca True tylko wtedy, gdy od tamtej pory któraś wartość się zmieniła.
+    """
+    def __init__(self, *observables):
+        self._observables = observables
+        self._seen = None
+
+    def changed(self):
+        versions = tuple(observable.version for observable in self._observables)
+        if versions == self._seen:
+            return False
+        self._seen = versions
+        return True
+
+    def invalidate(self):
+        """Wymusza odświeżenie przy następnym sprawdzeniu (np. po zmianie niezależnej od obserwowanych wartości)."""
+        self._seen = None